@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, PostgresDsn, RedisDsn, SecretStr, field_validator
+from functools import lru_cache
 from typing import List, Any
 import json
 
@@ -52,6 +53,12 @@ class Settings(BaseSettings):
     REDIS_PASSWORD: SecretStr | None = None
     REDIS_DB: int = 0
     REDIS_SSL: bool = False
+    REDIS_MAX_CONNECTIONS: int = Field(
+        default=64, description="Redis connection pool size"
+    )
+    REDIS_HEALTH_CHECK_INTERVAL: int = Field(
+        default=30, description="Redis connection health check interval in seconds"
+    )
 
     # Calculated Redis DSN
     @property
@@ -102,8 +109,14 @@ class Settings(BaseSettings):
         return value
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Возвращает единственный экземпляр настроек (валидируется один раз)."""
+    return Settings()
+
+
 # Create a single, reusable settings instance
-settings = Settings()
+settings = get_settings()
 
 # Example usage block (optional, can be removed)
 if __name__ == "__main__":
@@ -14,6 +14,7 @@ from src.auth.router import router as auth_router
 from src.api.v1.router import router as api_v1_router
 from src.api.v1.routers.redirect import router as redirect_router
 from src.utils.demo_data import create_demo_data
+from src.services.project import reset_public_project_cache
 import os
 
 
@@ -40,6 +41,8 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
 
             # Пересоздаем таблицы
             await create_db_and_tables(drop_first=True)
+            # Старый публичный проект удален вместе с таблицами
+            await reset_public_project_cache()
             # Создаем демонстрационные данные
             logger.info("Creating demo data...")
             await create_demo_data()
@@ -3,7 +3,7 @@ from typing import Optional
 from uuid import UUID
 from pydantic import BaseModel, Field, HttpUrl, field_validator
 from src.core.logger import logger
-from src.utils.utils import ensure_timezone
+from src.utils.utils import UTCDatetime, ensure_timezone
 
 
 class LinkPublicBase(BaseModel):
@@ -11,7 +11,7 @@ class LinkPublicBase(BaseModel):
 
     original_url: HttpUrl
     short_code: Optional[str] = Field(None, min_length=3, max_length=15)
-    expires_at: Optional[datetime] = Field(
+    expires_at: Optional[UTCDatetime] = Field(
         None,
         description="Время истечения ссылки",
     )
@@ -84,7 +84,9 @@ class LinkUpdate(BaseModel):
     Все поля необязательные, можно обновить только то, что нужно."""
 
     original_url: Optional[HttpUrl] = Field(None, description="URL ссылки")
-    expires_at: Optional[datetime] = Field(None, description="Время истечения ссылки")
+    expires_at: Optional[UTCDatetime] = Field(
+        None, description="Время истечения ссылки"
+    )
     is_public: Optional[bool] = Field(None, description="Флаг публичности ссылки")
 
 
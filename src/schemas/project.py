@@ -66,3 +66,5 @@ class PublicProject(ProjectBase):
 
     class Config:
         from_attributes = True
+        # Снимок делится между запросами через кэш, поэтому неизменяем
+        frozen = True
@@ -1,10 +1,10 @@
 from datetime import datetime, timedelta, timezone
 import random
 import string
-from typing import List, Optional, Dict, Any, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
 from fastapi import HTTPException, status
-from sqlalchemy import and_, or_, select, update, delete, func
+from sqlalchemy import and_, or_, select, insert, update, delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.utils.utils import ensure_timezone
@@ -20,7 +20,12 @@ from src.schemas.link import (
     LinkCacheStatic,
     LinkClickStats,
 )
-from src.utils.cache import cache_manager
+from src.utils.cache import (
+    LINK_CACHE_PREFIX,
+    cache_manager,
+    link_acl_cache_key,
+    link_missing_cache_key,
+)
 
 
 class LinkService:
@@ -31,7 +36,9 @@ class LinkService:
             session: Сессия базы данных
         """
         self.session = session
-        self.cache_prefix = "link:"
+        self.cache_prefix = LINK_CACHE_PREFIX
+        # Индекс (Redis SET) ключей популярных ссылок для всех значений limit
+        self._popular_index_key = f"idx:{self.cache_prefix}popular"
         self.cache_ttl = 3600  # 1 час
 
     async def create_link(
@@ -139,23 +146,94 @@ class LinkService:
                     detail="Срок действия ссылки должен быть не менее 5 минут от текущего времени",
                 )
 
-        # Создаем ссылку
-        new_link = Link(
-            original_url=str(data.original_url),
-            short_code=data.short_code,
-            expires_at=data.expires_at,
-            owner_id=user_id,
-            project_id=data.project_id,
-            is_public=data.is_public,
+        # Создаем ссылку: значения по умолчанию возвращаются через RETURNING,
+        # поэтому отдельный refresh не нужен
+        stmt = (
+            insert(Link)
+            .values(
+                original_url=str(data.original_url),
+                short_code=data.short_code,
+                expires_at=data.expires_at,
+                owner_id=user_id,
+                project_id=data.project_id,
+                is_public=data.is_public,
+            )
+            .returning(Link)
         )
-
-        self.session.add(new_link)
+        new_link = (await self.session.execute(stmt)).scalar_one()
         await self.session.commit()
-        await self.session.refresh(new_link)
         logger.debug(f"Created link:\n{new_link}")
 
+        # Для нового кода в кэше может быть только признак отсутствия ссылки
+        # (например, кастомный код запрашивали до создания) - удаляем его
+        await cache_manager.delete(link_missing_cache_key(new_link.short_code))
+
         return new_link
 
+    async def bulk_create_links(self, rows: List[Dict[str, Any]]) -> List[Link]:
+        """Массовое создание ссылок одним запросом без проверок доступа.
+
+        Предназначено для заполнения БД (демонстрационные данные, импорт).
+        Для строк без short_code генерируется уникальный код, для строк без
+        expires_at срок жизни берется из настроек проекта. Транзакция не
+        фиксируется: это делает вызывающий код.
+
+        Args:
+            rows: Данные ссылок: original_url, owner_id, project_id и
+                опционально short_code, expires_at, is_public
+
+        Returns:
+            Созданные ссылки в порядке входных данных
+
+        Raises:
+            HTTPException: Если проект какой-либо из строк не найден
+        """
+        rows = [dict(row) for row in rows]
+
+        # Сроки жизни ссылок по умолчанию для всех проектов получаем одним запросом,
+        # он же проверяет, что проекты существуют
+        project_ids = {row["project_id"] for row in rows}
+        lifetimes = {}
+        if project_ids:
+            query = select(Project.id, Project.default_link_lifetime_days).where(
+                Project.id.in_(project_ids)
+            )
+            result = await self.session.execute(query)
+            lifetimes = dict(result.all())
+
+        unknown_ids = project_ids - lifetimes.keys()
+        if unknown_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Проекты с ID {sorted(unknown_ids)} не найдены",
+            )
+
+        # Короткие коды для всех строк без кода резервируются одной проверкой
+        missing_codes = [row for row in rows if not row.get("short_code")]
+        explicit_codes = {row["short_code"] for row in rows if row.get("short_code")}
+        short_codes = await self._reserve_short_codes(
+            len(missing_codes), exclude=explicit_codes
+        )
+        for row, short_code in zip(missing_codes, short_codes):
+            row["short_code"] = short_code
+
+        current_time = datetime.now(timezone.utc)
+        for row in rows:
+            row["original_url"] = str(row["original_url"])
+            if row.get("expires_at"):
+                row["expires_at"] = ensure_timezone(row["expires_at"])
+            else:
+                days = lifetimes[row["project_id"]]
+                row["expires_at"] = current_time + timedelta(days=days)
+
+        result = await self.session.scalars(
+            insert(Link).returning(Link, sort_by_parameter_order=True), rows
+        )
+        links = result.all()
+        logger.debug(f"Created {len(links)} links")
+
+        return links
+
     async def get_link_by_short_code(
         self, short_code: str, user: Optional[User] = None
     ) -> Link:
@@ -395,6 +473,9 @@ class LinkService:
         await self.session.execute(stmt)
         await self.session.commit()
 
+        # Данные и права доступа могли измениться - сбрасываем кэш ссылки
+        await self._invalidate_link_cache(short_code)
+
         # Получаем обновленную ссылку
         return await self._get_link_by_short_code(short_code)
 
@@ -434,6 +515,8 @@ class LinkService:
         await self.session.execute(stmt)
         await self.session.commit()
 
+        await self._invalidate_link_cache(short_code)
+
         return {"message": f"Ссылка с кодом '{short_code}' успешно удалена"}
 
     async def get_link_stats(self, short_code: str, user_id: UUID) -> LinkStats:
@@ -649,6 +732,7 @@ class LinkService:
             cache_key,
             [LinkCache.from_link(link).model_dump() for link in links],
             expire=600,  # 10 минут
+            index_key=self._popular_index_key,
         )
 
         return links
@@ -685,13 +769,30 @@ class LinkService:
         await self.session.commit()
 
         logger.debug(" > > Invalidate cache for popular links")
-        # Очищаем кэш популярных ссылок
-        await cache_manager.delete(f"{self.cache_prefix}popular:*")
+        # Очищаем кэш популярных ссылок по индексу, без обхода ключей через SCAN
+        await cache_manager.delete_indexed(self._popular_index_key)
 
         deleted_count = result.rowcount
         logger.debug(f" > > Cleaned up {deleted_count} expired links")
         return deleted_count
 
+    async def _invalidate_link_cache(self, short_code: str) -> None:
+        """Удаление из кэша данных, статистики и прав доступа к ссылке.
+
+        Args:
+            short_code: Короткий код ссылки
+        """
+        logger.debug(f" > > Invalidate cache for link: {short_code}")
+        # Все ключи ссылки удаляются одной командой DEL
+        await cache_manager.delete_many(
+            [
+                link_acl_cache_key(short_code),
+                link_missing_cache_key(short_code),
+                f"{self.cache_prefix}{short_code}:static",
+                f"{self.cache_prefix}{short_code}:stats",
+            ]
+        )
+
     async def _generate_short_code(self, length: int = 7) -> str:
         """Генерация уникального короткого кода.
 
@@ -711,6 +812,43 @@ class LinkService:
             if not existing:
                 return short_code
 
+    async def _reserve_short_codes(
+        self, n: int, length: int = 7, exclude: Iterable[str] = ()
+    ) -> List[str]:
+        """Генерация нескольких уникальных коротких кодов.
+
+        Кандидаты генерируются с запасом и проверяются на занятость одним
+        запросом, вместо отдельного запроса на каждый код.
+
+        Args:
+            n: Количество кодов
+            length: Длина короткого кода
+            exclude: Коды, которые нельзя использовать (например, уже выбранные
+                в той же пачке вставки)
+
+        Returns:
+            Список уникальных коротких кодов
+        """
+        chars = string.ascii_letters + string.digits
+        taken = set(exclude)
+        reserved: List[str] = []
+        while len(reserved) < n:
+            # Генерируем вдвое больше кандидатов, чем осталось зарезервировать
+            candidates = {
+                "".join(random.choices(chars, k=length))
+                for _ in range(2 * (n - len(reserved)))
+            } - taken
+
+            # Проверяем занятость всех кандидатов одним запросом
+            query = select(Link.short_code).where(Link.short_code.in_(candidates))
+            existing = set((await self.session.scalars(query)).all())
+
+            free = candidates - existing
+            taken |= candidates
+            reserved.extend(list(free)[: n - len(reserved)])
+
+        return reserved
+
     async def _get_link_by_short_code(self, short_code: str) -> Optional[Link]:
         """Получение ссылки по короткому коду без проверок.
 
@@ -868,11 +1006,20 @@ class LinkService:
             - Второй элемент: True, если пользователь может изменять ссылку
         """
         link = None  # Initialize link to None
-        # Проверяем, есть ли результат в кэше
-        cache_key = f"{self.cache_prefix}{short_code}:acl:{user_id}"
-        cached_result = await cache_manager.get(cache_key)
-        if cached_result:
-            return cached_result
+        # Проверяем, есть ли результат в кэше.
+        # Права всех пользователей на ссылку хранятся в одном хэше:
+        # поле - ID пользователя, значение - битовая маска (1 - чтение, 2 - изменение)
+        acl_key = link_acl_cache_key(short_code)
+        acl_field = str(user_id)
+        cached_result = await cache_manager.hget(acl_key, acl_field)
+        if cached_result is not None:
+            flags = int(cached_result)
+            return bool(flags & 1), bool(flags & 2)
+
+        # Отсутствие ссылки кэшируется отдельным ключом, общим для всех пользователей
+        missing_key = link_missing_cache_key(short_code)
+        if await cache_manager.get(missing_key):
+            return False, False
 
         # Получаем права доступа к ссылке вот таким запросом:
         # SELECT
@@ -928,18 +1075,25 @@ class LinkService:
         row = result.first()  # Получаем всю строку, а не только первый объект
 
         if not row:
-            can_read, can_modify = False, False
             logger.debug(f" > > Link not found: {short_code}")
-        else:
-            # Распаковываем все колонки из результата
-            (link, _, _, _, _, can_read, can_modify) = row
-            # Move logging inside the else block
-            logger.debug(f" > > Link: {link}")
-            logger.debug(
-                f" > > Permissions: can_read={can_read}, can_modify={can_modify}"
-            )
-
-        # Кешируем результат на 10 минут
-        await cache_manager.set(cache_key, (can_read, can_modify), expire=300)
+            # Отсутствие ссылки кэшируем на 30 секунд отдельным ключом, чтобы
+            # перебор случайных кодов ботами не раздувал кэш и не смешивался
+            # с правами на существующую ссылку
+            await cache_manager.set(missing_key, True, expire=30)
+            return False, False
+
+        # Распаковываем все колонки из результата
+        (link, _, _, _, _, can_read, can_modify) = row
+        logger.debug(f" > > Link: {link}")
+        logger.debug(f" > > Permissions: can_read={can_read}, can_modify={can_modify}")
+
+        # Кешируем результат на 5 минут.
+        # Время жизни задается для всего хэша ссылки при его создании
+        await cache_manager.hset(
+            acl_key,
+            acl_field,
+            int(bool(can_read)) | int(bool(can_modify)) << 1,
+            expire=300,
+        )
 
         return can_read, can_modify
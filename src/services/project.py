@@ -1,15 +1,57 @@
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+import time
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 from fastapi import HTTPException, status
-from sqlalchemy import select, update, delete
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Select,
+    and_,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    update,
+    delete,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.models.project import Project, project_members
 from src.models.link import Link
 from src.models.user import User
-from src.schemas.project import ProjectCreate, ProjectUpdate, ProjectMemberCreate
+from src.schemas.project import (
+    ProjectCreate,
+    ProjectUpdate,
+    ProjectMemberCreate,
+    PublicProject,
+)
+from src.utils.cache import cache_manager, link_acl_cache_key
+
+# Ключ кэша для ID публичного проекта (общий для всех воркеров)
+PUBLIC_PROJECT_CACHE_KEY = "public_project:id"
+PUBLIC_PROJECT_CACHE_TTL = 86400  # 24 часа
+
+# Публичный проект практически не меняется, поэтому храним в памяти процесса
+# его неизменяемый снимок (не ORM-объект) вместе с моментом устаревания.
+# Короткий срок жизни ограничивает устаревание в других воркерах, где
+# сброс кэша этим процессом не виден
+PUBLIC_PROJECT_LOCAL_TTL = 60  # секунд
+_public_project_cache: Optional[Tuple[PublicProject, float]] = None
+
+
+async def reset_public_project_cache() -> None:
+    """Сброс кэша публичного проекта (например, после пересоздания БД)."""
+    global _public_project_cache
+    _public_project_cache = None
+    if cache_manager.is_initialized:
+        await cache_manager.delete(PUBLIC_PROJECT_CACHE_KEY)
 
 
 class ProjectService:
@@ -31,16 +73,18 @@ class ProjectService:
         Returns:
             Созданный проект
         """
-        new_project = Project(
-            name=data.name,
-            description=data.description,
-            default_link_lifetime_days=data.default_link_lifetime_days,
-            owner_id=user_id,
+        # ID и дата создания возвращаются через RETURNING, поэтому refresh не нужен
+        stmt = (
+            insert(Project)
+            .values(
+                name=data.name,
+                description=data.description,
+                default_link_lifetime_days=data.default_link_lifetime_days,
+                owner_id=user_id,
+            )
+            .returning(Project)
         )
-
-        self.session.add(new_project)
-        await self.session.commit()
-        await self.session.refresh(new_project)
+        new_project = (await self.session.execute(stmt)).scalar_one()
 
         # Создатель проекта автоматически становится его администратором
         stmt = project_members.insert().values(
@@ -57,6 +101,54 @@ class ProjectService:
         # Это избежит попыток загрузить members асинхронно
         return new_project
 
+    async def bulk_create_projects(
+        self, projects: List[ProjectCreate], owner_ids: List[UUID]
+    ) -> List[Project]:
+        """Массовое создание проектов.
+
+        Все проекты вставляются одним запросом INSERT ... RETURNING,
+        владельцы добавляются администраторами проектов вторым запросом.
+        Транзакция не фиксируется: это делает вызывающий код, что позволяет
+        выполнить все заполнение БД в одной транзакции.
+
+        Args:
+            projects: Данные новых проектов
+            owner_ids: ID владельцев проектов (в том же порядке, что и projects)
+
+        Returns:
+            Созданные проекты в порядке входных данных
+        """
+        rows = [
+            {
+                "name": data.name,
+                "description": data.description,
+                "default_link_lifetime_days": data.default_link_lifetime_days,
+                "owner_id": owner_id,
+            }
+            for data, owner_id in zip(projects, owner_ids, strict=True)
+        ]
+        result = await self.session.scalars(
+            insert(Project).returning(Project, sort_by_parameter_order=True), rows
+        )
+        new_projects = result.all()
+
+        # Создатели проектов автоматически становятся их администраторами
+        joined_at = datetime.now(timezone.utc)
+        await self.session.execute(
+            insert(project_members),
+            [
+                {
+                    "project_id": project.id,
+                    "user_id": project.owner_id,
+                    "is_admin": True,
+                    "joined_at": joined_at,
+                }
+                for project in new_projects
+            ],
+        )
+
+        return new_projects
+
     async def get_project_by_id(
         self, project_id: int, user_id: UUID, is_superuser: bool = False
     ) -> Project:
@@ -121,13 +213,21 @@ class ProjectService:
             # Суперпользователь видит все проекты
             query = select(Project).order_by(Project.created_at.desc())
         else:
-            # Обычный пользователь видит проекты, где он владелец или участник
+            # Обычный пользователь видит проекты, где он владелец или участник.
+            # EXISTS вместо JOIN не размножает строки, если пользователь
+            # одновременно владелец и участник проекта
             query = (
                 select(Project)
-                .outerjoin(project_members, Project.id == project_members.c.project_id)
                 .where(
-                    (Project.owner_id == user_id)
-                    | (project_members.c.user_id == user_id)
+                    or_(
+                        Project.owner_id == user_id,
+                        exists().where(
+                            and_(
+                                project_members.c.project_id == Project.id,
+                                project_members.c.user_id == user_id,
+                            )
+                        ),
+                    )
                 )
                 .order_by(Project.created_at.desc())
             )
@@ -170,6 +270,7 @@ class ProjectService:
         stmt = update(Project).where(Project.id == project_id).values(**update_data)
         await self.session.execute(stmt)
         await self.session.commit()
+        await self._invalidate_public_project_cache(project_id)
 
         # Получаем обновленный проект
         return await self.get_project_by_id(project_id, user_id, False)
@@ -208,6 +309,7 @@ class ProjectService:
         stmt = delete(Project).where(Project.id == project_id)
         await self.session.execute(stmt)
         await self.session.commit()
+        await self._invalidate_public_project_cache(project_id)
 
         return {"message": f"Проект с ID {project_id} успешно удален"}
 
@@ -228,53 +330,70 @@ class ProjectService:
             HTTPException: Если проект не найден, пользователь не имеет прав админа,
                           или добавляемый пользователь не найден
         """
-        # Проверяем, существует ли проект и является ли пользователь его администратором
-        await self._check_project_admin(project_id, user_id)
-
-        # Ищем пользователя по email
-        query = select(User).where(User.email == data.email)
+        # Проверка прав, поиск пользователя по email и добавление/обновление роли
+        # выполняются одним запросом:
+        # WITH project AS (SELECT ... права текущего пользователя ...),
+        #      target AS (SELECT id FROM users WHERE email = :email),
+        #      upsert AS (INSERT INTO project_members SELECT ... FROM project, target
+        #                 WHERE <есть права> ON CONFLICT DO UPDATE ... RETURNING)
+        # SELECT project.*, target.id, EXISTS(<участник>) FROM project LEFT JOIN target
+        project_cte = self._project_access_query(project_id, user_id).cte("project")
+        target_cte = select(User.id).where(User.email == data.email).cte("target")
+
+        new_member_query = (
+            select(
+                project_cte.c.id,
+                target_cte.c.id,
+                literal(data.is_admin, Boolean),
+                literal(datetime.now(timezone.utc), DateTime(timezone=True)),
+            )
+            .select_from(project_cte.join(target_cte, true()))
+            .where(
+                project_cte.c.name != "Public",
+                or_(project_cte.c.owner_id == user_id, project_cte.c.is_admin),
+            )
+        )
+        upsert = pg_insert(project_members).from_select(
+            ["project_id", "user_id", "is_admin", "joined_at"], new_member_query
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[project_members.c.project_id, project_members.c.user_id],
+            set_={"is_admin": upsert.excluded.is_admin},
+        ).returning(project_members.c.user_id)
+        upsert_cte = upsert.cte("upsert")
+
+        # Все части запроса видят один снимок БД, поэтому EXISTS проверяет
+        # членство до вставки: так отличаем добавление от обновления роли
+        query = select(
+            project_cte,
+            target_cte.c.id.label("member_id"),
+            exists()
+            .where(
+                project_members.c.project_id == project_cte.c.id,
+                project_members.c.user_id == target_cte.c.id,
+            )
+            .label("was_member"),
+            select(func.count()).select_from(upsert_cte).scalar_subquery(),
+        ).select_from(project_cte.outerjoin(target_cte, true()))
         result = await self.session.execute(query)
-        new_member = result.scalars().first()
+        row = result.first()
 
-        if not new_member:
+        # Ошибки доступа проверяются по той же строке, что и в _check_project_admin
+        self._ensure_project_admin(row, project_id, user_id)
+
+        if row.member_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Пользователь с email {data.email} не найден",
             )
 
-        # Проверяем, не добавлен ли пользователь уже в проект
-        query = select(project_members).where(
-            project_members.c.project_id == project_id,
-            project_members.c.user_id == new_member.id,
-        )
-        result = await self.session.execute(query)
-        existing_member = result.first()
-
-        if existing_member:
-            # Если пользователь уже в проекте, просто обновляем его роль
-            stmt = (
-                update(project_members)
-                .where(
-                    project_members.c.project_id == project_id,
-                    project_members.c.user_id == new_member.id,
-                )
-                .values(is_admin=data.is_admin)
-            )
-            await self.session.execute(stmt)
-            await self.session.commit()
+        await self.session.commit()
+        await self._invalidate_links_acl_cache(project_id)
 
+        if row.was_member:
+            # Пользователь уже был в проекте, его роль обновлена
             return {"message": f"Роль пользователя с email {data.email} обновлена"}
 
-        # Добавляем пользователя в проект
-        stmt = project_members.insert().values(
-            project_id=project_id,
-            user_id=new_member.id,
-            is_admin=data.is_admin,
-            joined_at=datetime.now(timezone.utc),
-        )
-        await self.session.execute(stmt)
-        await self.session.commit()
-
         return {
             "message": f"Пользователь с email {data.email} успешно добавлен в проект"
         }
@@ -320,25 +439,43 @@ class ProjectService:
             )
 
         await self.session.commit()
+        await self._invalidate_links_acl_cache(project_id)
 
         return {"message": "Пользователь успешно удален из проекта"}
 
-    async def create_public_project(self) -> Project:
+    async def create_public_project(self) -> PublicProject:
         """Создание или получение публичного проекта.
 
+        Результат кэшируется в памяти процесса, а его ID - в Redis,
+        поэтому запрос к БД выполняется только при первом обращении.
+
         Returns:
-            Публичный проект
+            Неизменяемый снимок публичного проекта
         """
+        if _public_project_cache is not None:
+            snapshot, expires_at = _public_project_cache
+            if time.monotonic() < expires_at:
+                return snapshot
+
+        # Другой воркер мог уже найти публичный проект - ищем по первичному ключу
+        cached_id = None
+        if cache_manager.is_initialized:
+            cached_id = await cache_manager.get(PUBLIC_PROJECT_CACHE_KEY)
+        public_project = None
+        if cached_id:
+            query = select(Project).where(Project.id == cached_id)
+            result = await self.session.execute(query)
+            public_project = result.scalars().first()
+
         # Проверяем, существует ли уже публичный проект
-        query = select(Project).where(Project.name == "Public")
-        result = await self.session.execute(query)
-        public_project = result.scalars().first()
+        if not public_project:
+            query = select(Project).where(Project.name == "Public")
+            result = await self.session.execute(query)
+            public_project = result.scalars().first()
 
         # Если публичный проект существует, возвращаем его
         if public_project:
-            # Изолируем из сессии, чтобы избежать загрузки связей
-            self.session.expunge(public_project)
-            return public_project
+            return await self._cache_public_project(public_project)
 
         # Получаем ID администратора системы (первого суперпользователя)
         from src.models.user import User
@@ -380,35 +517,126 @@ class ProjectService:
         self.session.add(public_project)
         await self.session.commit()
 
-        # Получаем проект без связей и изолируем его из сессии
+        # После commit атрибуты истекли: загружаем колонки проекта без связей
         query = select(Project).where(Project.id == public_project.id)
         result = await self.session.execute(query)
         public_project = result.scalars().first()
-        self.session.expunge(public_project)
 
-        return public_project
+        return await self._cache_public_project(public_project)
+
+    async def _cache_public_project(self, public_project: Project) -> PublicProject:
+        """Сохранение снимка публичного проекта в памяти процесса и его ID в Redis.
+
+        Args:
+            public_project: Публичный проект, загруженный из БД
+
+        Returns:
+            Неизменяемый снимок публичного проекта
+        """
+        global _public_project_cache
+        snapshot = PublicProject.model_validate(public_project)
+        _public_project_cache = (snapshot, time.monotonic() + PUBLIC_PROJECT_LOCAL_TTL)
+        if cache_manager.is_initialized:
+            await cache_manager.set(
+                PUBLIC_PROJECT_CACHE_KEY,
+                snapshot.id,
+                expire=PUBLIC_PROJECT_CACHE_TTL,
+            )
+        return snapshot
 
-    async def _check_project_admin(self, project_id: int, user_id: UUID) -> Project:
+    async def _invalidate_public_project_cache(self, project_id: int) -> None:
+        """Сброс кэша публичного проекта, если операция затронула его.
+
+        Args:
+            project_id: ID измененного или удаленного проекта
+        """
+        if _public_project_cache is not None:
+            cached_id = _public_project_cache[0].id
+        elif cache_manager.is_initialized:
+            cached_id = await cache_manager.get(PUBLIC_PROJECT_CACHE_KEY)
+        else:
+            cached_id = None
+
+        if cached_id == project_id:
+            await reset_public_project_cache()
+
+    async def _invalidate_links_acl_cache(self, project_id: int) -> None:
+        """Удаление закэшированных прав доступа ко всем ссылкам проекта.
+
+        Вызывается при изменении состава участников проекта.
+
+        Args:
+            project_id: ID проекта
+        """
+        result = await self.session.execute(
+            select(Link.short_code).where(Link.project_id == project_id)
+        )
+        await cache_manager.delete_many(
+            [link_acl_cache_key(code) for code in result.scalars()]
+        )
+
+    async def _check_project_admin(self, project_id: int, user_id: UUID) -> Row:
         """Проверка, является ли пользователь администратором проекта.
 
+        Загружает только нужные колонки проекта и признак администратора
+        одним запросом, без загрузки участников.
+
         Args:
             project_id: ID проекта
             user_id: ID пользователя
 
         Returns:
-            Проект, если пользователь является его администратором
+            Строка с полями id, owner_id, name и is_admin проекта,
+            если пользователь является его администратором
 
         Raises:
             HTTPException: Если проект не найден или пользователь не является админом
         """
-        query = (
-            select(Project)
-            .where(Project.id == project_id)
-            .options(selectinload(Project.members))
+        result = await self.session.execute(
+            self._project_access_query(project_id, user_id)
         )
-        result = await self.session.execute(query)
-        project = result.scalars().first()
+        project = result.first()
+        self._ensure_project_admin(project, project_id, user_id)
+        return project
+
+    def _project_access_query(self, project_id: int, user_id: UUID) -> Select:
+        """Запрос колонок проекта, нужных для проверки прав, и признака администратора.
+
+        Args:
+            project_id: ID проекта
+            user_id: ID пользователя
+
+        Returns:
+            Запрос, возвращающий id, owner_id, name и is_admin проекта
+        """
+        return select(
+            Project.id,
+            Project.owner_id,
+            Project.name,
+            exists()
+            .where(
+                and_(
+                    project_members.c.project_id == Project.id,
+                    project_members.c.user_id == user_id,
+                    project_members.c.is_admin.is_(True),
+                )
+            )
+            .label("is_admin"),
+        ).where(Project.id == project_id)
+
+    def _ensure_project_admin(
+        self, project: Optional[Row], project_id: int, user_id: UUID
+    ) -> None:
+        """Проверка прав администратора по строке из _project_access_query.
+
+        Args:
+            project: Строка с полями id, owner_id, name и is_admin или None
+            project_id: ID проекта
+            user_id: ID пользователя
 
+        Raises:
+            HTTPException: Если проект не найден или пользователь не является админом
+        """
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -423,24 +651,8 @@ class ProjectService:
             )
 
         # Проверка, является ли пользователь владельцем или администратором
-        if project.owner_id == user_id:
-            # Мы не делаем session.expunge здесь, чтобы сохранить данные связей
-            # для последующих проверок в вызывающих методах
-            return project
-
-        # Проверяем, есть ли пользователь среди администраторов проекта
-        query = select(project_members).where(
-            project_members.c.project_id == project_id,
-            project_members.c.user_id == user_id,
-            project_members.c.is_admin == True,
-        )
-        result = await self.session.execute(query)
-        is_admin = result.first() is not None
-
-        if not is_admin:
+        if project.owner_id != user_id and not project.is_admin:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Для выполнения этой операции требуются права администратора проекта",
             )
-
-        return project
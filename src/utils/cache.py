@@ -1,28 +1,48 @@
 from typing import Optional, Any
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
-from redis.asyncio import Redis
+from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.connection import Connection, SSLConnection
 from src.core.config import settings
 from src.core.logger import logger
+import functools
 import json
-from pydantic import HttpUrl
+from pydantic import BaseModel, HttpUrl
 from datetime import datetime, timezone
 
 
+@functools.singledispatch
+def _json_default(obj: Any) -> Any:
+    """Сериализация специальных типов в JSON (выбор реализации по типу объекта)."""
+    # Любые объекты с model_dump, а не только наследники BaseModel
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@_json_default.register(HttpUrl)
+def _(obj: HttpUrl) -> str:
+    return str(obj)
+
+
+@_json_default.register(datetime)
+def _(obj: datetime) -> str:
+    # Добавляем явный часовой пояс UTC, если он отсутствует
+    if obj.tzinfo is None:
+        obj = obj.replace(tzinfo=timezone.utc)
+    return obj.isoformat()
+
+
+@_json_default.register(BaseModel)
+def _(obj: BaseModel) -> Any:
+    return obj.model_dump()
+
+
 class PydanticJSONEncoder(json.JSONEncoder):
     """JSON кодировщик для Pydantic моделей и специальных типов."""
 
     def default(self, obj):
-        if isinstance(obj, HttpUrl):
-            return str(obj)
-        if isinstance(obj, datetime):
-            # Добавляем явный часовой пояс UTC, если он отсутствует
-            if obj.tzinfo is None:
-                obj = obj.replace(tzinfo=timezone.utc)
-            return obj.isoformat()
-        if hasattr(obj, "model_dump"):
-            return obj.model_dump()
-        return super().default(obj)
+        return _json_default(obj)
 
 
 class CacheManager:
@@ -30,8 +50,14 @@ class CacheManager:
 
     def __init__(self):
         self.redis: Optional[Redis] = None
+        self.pool: Optional[ConnectionPool] = None
         self.backend: Optional[RedisBackend] = None
 
+    @property
+    def is_initialized(self) -> bool:
+        """Подключен ли менеджер к Redis (в тестах init() не вызывается)."""
+        return self.redis is not None
+
     async def init(self):
         """Инициализация подключения к Redis."""
         try:
@@ -42,14 +68,20 @@ class CacheManager:
                 else None
             )
 
-            self.redis = Redis(
+            # Общий пул соединений: конкурентные корутины не ждут друг друга
+            # на одном соединении, а mget/mset/pipeline выполняются параллельно
+            # на разных соединениях пула
+            self.pool = ConnectionPool(
                 host=settings.REDIS_HOST,
                 port=settings.REDIS_PORT,
                 password=redis_password,
                 db=settings.REDIS_DB,
                 decode_responses=True,
-                ssl=settings.REDIS_SSL,
+                connection_class=SSLConnection if settings.REDIS_SSL else Connection,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
             )
+            self.redis = Redis(connection_pool=self.pool)
             self.backend = RedisBackend(self.redis)
             FastAPICache.init(self.backend, prefix="fastapi-cache")
             logger.info("Cache manager initialized successfully")
@@ -75,13 +107,21 @@ class CacheManager:
             logger.error(f"Error getting cache value for key {key}: {e}")
             return None
 
-    async def set(self, key: str, value: Any, expire: int = 3600) -> bool:
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expire: int = 3600,
+        index_key: Optional[str] = None,
+    ) -> bool:
         """Установка значения в кэш.
 
         Args:
             key: Ключ кэша
             value: Значение для кэширования
             expire: Время жизни кэша в секундах
+            index_key: Ключ индекса (Redis SET), в который нужно добавить ключ,
+                чтобы потом удалить всю группу через delete_indexed
 
         Returns:
             True если успешно, False в случае ошибки
@@ -89,12 +129,62 @@ class CacheManager:
         try:
             # Сериализуем значение в JSON с использованием специального кодировщика
             serialized_value = json.dumps(value, cls=PydanticJSONEncoder)
-            await self.backend.set(key, serialized_value, expire)
+            if index_key:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.set(key, serialized_value, ex=expire)
+                    pipe.sadd(index_key, key)
+                    # Индекс живет не меньше, чем последний добавленный ключ
+                    pipe.expire(index_key, expire)
+                    await pipe.execute()
+            else:
+                await self.backend.set(key, serialized_value, expire)
             return True
         except Exception as e:
             logger.error(f"Error setting cache value for key {key}: {e}")
             return False
 
+    async def hget(self, key: str, field: str) -> Optional[str]:
+        """Получение поля хэша из кэша.
+
+        Args:
+            key: Ключ хэша
+            field: Имя поля
+
+        Returns:
+            Значение поля или None, если не найдено
+        """
+        try:
+            return await self.redis.hget(key, field)
+        except Exception as e:
+            logger.error(f"Error getting cache hash field {key}[{field}]: {e}")
+            return None
+
+    async def hset(self, key: str, field: str, value: Any, expire: int = 3600) -> bool:
+        """Установка поля хэша в кэш.
+
+        Время жизни задается для всего хэша только при его создании и не
+        продлевается последующими записями, чтобы хэш гарантированно истекал.
+
+        Args:
+            key: Ключ хэша
+            field: Имя поля
+            value: Значение поля (строка или число)
+            expire: Время жизни хэша в секундах
+
+        Returns:
+            True если успешно, False в случае ошибки
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, field, value)
+                # NX: выставляем TTL, только если у ключа его еще нет (Redis >= 7)
+                pipe.expire(key, expire, nx=True)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error setting cache hash field {key}[{field}]: {e}")
+            return False
+
     async def delete(self, key: str) -> bool:
         """Удаление значения из кэша.
 
@@ -124,6 +214,44 @@ class CacheManager:
             logger.error(f"Error deleting cache value for key {key}: {e}")
             return False
 
+    async def delete_many(self, keys: list[str]) -> bool:
+        """Удаление нескольких ключей одной командой DEL.
+
+        Args:
+            keys: Список ключей кэша (без wildcard)
+
+        Returns:
+            True если успешно, False в случае ошибки
+        """
+        if not keys:
+            return True
+        try:
+            await self.redis.delete(*keys)
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting cache values for keys {keys[:5]}...: {e}")
+            return False
+
+    async def delete_indexed(self, index_key: str) -> bool:
+        """Удаление группы ключей, зарегистрированных в индексе.
+
+        В отличие от delete с wildcard, не обходит все пространство ключей
+        через SCAN, а удаляет только ключи группы.
+
+        Args:
+            index_key: Ключ индекса (Redis SET)
+
+        Returns:
+            True если успешно, False в случае ошибки
+        """
+        try:
+            keys = await self.redis.smembers(index_key)
+            await self.redis.delete(*keys, index_key)
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting indexed cache keys for {index_key}: {e}")
+            return False
+
     async def clear(self) -> bool:
         """Очистка всего кэша.
 
@@ -141,7 +269,25 @@ class CacheManager:
         """Закрытие соединения с Redis."""
         if self.redis:
             await self.redis.close()
-            logger.info("Cache connection closed")
+        if self.pool:
+            # Пул передан явно, поэтому Redis.close() его не отключает
+            await self.pool.disconnect()
+        logger.info("Cache connection closed")
+
+
+# Префикс ключей кэша ссылок. Ключи прав доступа строятся здесь, а не
+# в сервисе ссылок, потому что их сбрасывает и сервис проектов
+LINK_CACHE_PREFIX = "link:"
+
+
+def link_acl_cache_key(short_code: str) -> str:
+    """Ключ хэша с закэшированными правами доступа к ссылке."""
+    return f"{LINK_CACHE_PREFIX}{short_code}:acl"
+
+
+def link_missing_cache_key(short_code: str) -> str:
+    """Ключ с закэшированным признаком отсутствия ссылки."""
+    return f"{LINK_CACHE_PREFIX}{short_code}:missing"
 
 
 # Создаем глобальный экземпляр менеджера кэша
@@ -1,21 +1,61 @@
 import asyncio
 import uuid
-from typing import Dict, Any, AsyncIterator
+from typing import AsyncIterator, List, Optional
 
-from fastapi import Depends
 from fastapi_users.password import PasswordHelper
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.users import UserManager, get_user_manager
-from src.core.database import get_async_session, engine
+from src.core.database import get_async_session
 from src.models.user import User
-from src.schemas.link import LinkCreate
 from src.schemas.project import ProjectCreate
 from src.services.project import ProjectService
 from src.services.link import LinkService
 from src.core.logger import logger
 
 
+# Пароль демонстрационных пользователей
+DEMO_PASSWORD = "password123"
+
+# Хеширование пароля намеренно дорогое, поэтому хеш вычисляется один раз
+# на процесс при первом создании демонстрационных данных
+_demo_password_hash: Optional[str] = None
+
+
+def _get_demo_password_hash() -> str:
+    """Получение хеша пароля демонстрационных пользователей."""
+    global _demo_password_hash
+    if _demo_password_hash is None:
+        _demo_password_hash = PasswordHelper().hash(DEMO_PASSWORD)
+    return _demo_password_hash
+
+
+async def _copy_users(session: AsyncSession, users: List[User]) -> None:
+    """Вставка пользователей в текущей транзакции сессии.
+
+    На PostgreSQL строки передаются командой COPY, минуя разбор и
+    планирование INSERT для каждой строки. На других СУБД используется
+    обычная вставка через ORM.
+
+    Args:
+        session: Сессия базы данных с открытой транзакцией
+        users: Пользователи с заполненными ID
+    """
+    connection = await session.connection()
+    if connection.dialect.name != "postgresql":
+        session.add_all(users)
+        await session.flush()
+        return
+
+    columns = [column.name for column in User.__table__.columns]
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        User.__tablename__,
+        records=[tuple(getattr(user, column) for column in columns) for user in users],
+        columns=columns,
+    )
+
+
 # Для совместимости с Python < 3.10
 async def get_next(aiter: AsyncIterator):
     """Получение следующего элемента из асинхронного итератора."""
@@ -43,173 +83,159 @@ async def create_demo_data() -> bool:
         - https://example.com/link6
 
     Returns:
-        True, если данные успешно созданы, иначе False
+        True, если данные успешно созданы или уже существуют
+
+    Raises:
+        Exception: Если при создании данных произошла ошибка (транзакция откатывается)
     """
     # Получаем сессию через стандартный метод
     session_generator = get_async_session()
     session = await get_next(session_generator)
     try:
+        # Если демонстрационные данные уже созданы, повторно их не создаем:
+        # один запрос по уникальному индексу вместо цепочки конфликтующих INSERT
+        query = select(User.id).where(User.email == "admin@example.com").limit(1)
+        if await session.scalar(query):
+            logger.info("Demo data already present, skipping")
+            return True
+
         # Создаем экземпляр сервиса проектов
         project_service = ProjectService(session)
         link_service = LinkService(session)
         # Создаем публичный проект
         public_project = await project_service.create_public_project()
 
-        # Создаем тестового пользователя
-        password_helper = PasswordHelper()
-        hashed_password = password_helper.hash("password123")
-
-        # Создаем администратора
-        admin_user = User(
-            id=uuid.uuid4(),
-            email="admin@example.com",
-            hashed_password=hashed_password,
-            is_active=True,
-            is_verified=True,
-            is_superuser=True,
-        )
-        session.add(admin_user)
-        await session.commit()
-        await session.refresh(admin_user)
-
-        # Создаем обычного пользователя
-        user1 = User(
-            id=uuid.uuid4(),
-            email="user1@example.com",
-            hashed_password=hashed_password,
-            is_active=True,
-            is_verified=True,
-            is_superuser=False,
-        )
-        session.add(user1)
-        await session.commit()
-        await session.refresh(user1)
-
-        # Создаем еще одного пользователя
-        user2 = User(
-            id=uuid.uuid4(),
-            email="user2@example.com",
-            hashed_password=hashed_password,
-            is_active=True,
-            is_verified=True,
-            is_superuser=False,
-        )
-        session.add(user2)
+        # Публичный проект общий для приложения, и сервис фиксирует его создание
+        # сам; завершаем оставшуюся после его поиска транзакцию чтения
         await session.commit()
-        await session.refresh(user2)
-
-        # Создаем два проекта для пользователя user1
-        project1 = await project_service.create_project(
-            data=ProjectCreate(
-                name="Личный проект user1",
-                description="Проект для личных ссылок",
-                default_link_lifetime_days=30,
-            ),
-            user_id=user1.id,
-        )
 
-        project2 = await project_service.create_project(
-            data=ProjectCreate(
-                name="Рабочий проект user1",
-                description="Проект для рабочих ссылок",
-                default_link_lifetime_days=90,
-            ),
-            user_id=user1.id,
-        )
+        hashed_password = _get_demo_password_hash()
 
-        # Создаем два проекта для пользователя user2
-        project3 = await project_service.create_project(
-            data=ProjectCreate(
-                name="Рабочий проект user2",
-                description="Проект для рабочих ссылок",
-                default_link_lifetime_days=90,
-            ),
-            user_id=user2.id,
-        )
-
-        ############################################################
-        #  Создаем ссылки
-        ############################################################
+        # Все остальные данные создаются в одной транзакции: при ошибке
+        # она откатывается целиком
+        async with session.begin():
+            # Создаем администратора
+            admin_user = User(
+                id=uuid.uuid4(),
+                email="admin@example.com",
+                hashed_password=hashed_password,
+                is_active=True,
+                is_verified=True,
+                is_superuser=True,
+            )
 
-        # Публичная, от анонимного пользователя
-        link1 = await link_service.create_link(
-            data=LinkCreate(
-                original_url="https://example.com/link1",
-                # short_code="link1",  # автогенерация короткого кода
-                is_public=True,
+            # Создаем обычного пользователя
+            user1 = User(
+                id=uuid.uuid4(),
+                email="user1@example.com",
+                hashed_password=hashed_password,
+                is_active=True,
+                is_verified=True,
+                is_superuser=False,
             )
-        )
 
-        # Публичная, от пользователя user1 в проекте project1
-        link2 = await link_service.create_link(
-            data=LinkCreate(
-                original_url="https://example.com/link2",
-                short_code="link2",
-                project_id=project1.id,
-                is_public=True,
-            ),
-            user_id=user1.id,
-            project_id=project1.id,
-        )
+            # Создаем еще одного пользователя
+            user2 = User(
+                id=uuid.uuid4(),
+                email="user2@example.com",
+                hashed_password=hashed_password,
+                is_active=True,
+                is_verified=True,
+                is_superuser=False,
+            )
 
-        # Приватная, от пользователя user1 в проекте project1
-        link3 = await link_service.create_link(
-            data=LinkCreate(
-                original_url="https://example.com/link3",
-                # short_code="link3",  # автогенерация короткого кода
-                project_id=project1.id,
-                is_public=False,
-            ),
-            user_id=user1.id,
-            project_id=project1.id,
-        )
+            # Сохраняем всех пользователей одной командой COPY.
+            # ID генерируются на клиенте, поэтому refresh не нужен
+            await _copy_users(session, [admin_user, user1, user2])
 
-        # Приватная, от пользователя user1 в проекте project2
-        link4 = await link_service.create_link(
-            data=LinkCreate(
-                original_url="https://example.com/link4",
-                short_code="link4",
-                project_id=project2.id,
-                is_public=False,
-            ),
-            user_id=user1.id,
-            project_id=project2.id,
-        )
+            # Создаем два проекта для пользователя user1 и один для user2
+            # одним запросом
+            project1, project2, project3 = await project_service.bulk_create_projects(
+                [
+                    ProjectCreate(
+                        name="Личный проект user1",
+                        description="Проект для личных ссылок",
+                        default_link_lifetime_days=30,
+                    ),
+                    ProjectCreate(
+                        name="Рабочий проект user1",
+                        description="Проект для рабочих ссылок",
+                        default_link_lifetime_days=90,
+                    ),
+                    ProjectCreate(
+                        name="Рабочий проект user2",
+                        description="Проект для рабочих ссылок",
+                        default_link_lifetime_days=90,
+                    ),
+                ],
+                owner_ids=[user1.id, user1.id, user2.id],
+            )
 
-        # Публичная, от пользователя user2 в проекте project3
-        link5 = await link_service.create_link(
-            data=LinkCreate(
-                original_url="https://example.com/link5",
-                short_code="link5",
-                project_id=project3.id,
-                is_public=True,
-            ),
-            user_id=user2.id,
-            project_id=project3.id,
-        )
+            ############################################################
+            #  Создаем ссылки
+            ############################################################
 
-        # Приватная, от пользователя user2 в проекте project3
-        link6 = await link_service.create_link(
-            data=LinkCreate(
-                original_url="https://example.com/link6",
-                short_code="link6",
-                project_id=project3.id,
-                is_public=False,
-            ),
-            user_id=user2.id,
-            project_id=project3.id,
-        )
-        link22 = await link_service.create_link(
-            data=LinkCreate(
-                original_url="http://team22.ykdns.net/",
-                short_code="team22",
-                is_public=True,
-            ),
-            user_id=user1.id,
-            project_id=project1.id,
-        )
+            links = await link_service.bulk_create_links(
+                [
+                    # Публичная, от анонимного пользователя (автогенерация кода)
+                    {
+                        "original_url": "https://example.com/link1",
+                        "owner_id": public_project.owner_id,
+                        "project_id": public_project.id,
+                        "is_public": True,
+                    },
+                    # Публичная, от пользователя user1 в проекте project1
+                    {
+                        "original_url": "https://example.com/link2",
+                        "short_code": "link2",
+                        "owner_id": user1.id,
+                        "project_id": project1.id,
+                        "is_public": True,
+                    },
+                    # Приватная, от пользователя user1 в проекте project1
+                    # (автогенерация кода)
+                    {
+                        "original_url": "https://example.com/link3",
+                        "owner_id": user1.id,
+                        "project_id": project1.id,
+                        "is_public": False,
+                    },
+                    # Приватная, от пользователя user1 в проекте project2
+                    {
+                        "original_url": "https://example.com/link4",
+                        "short_code": "link4",
+                        "owner_id": user1.id,
+                        "project_id": project2.id,
+                        "is_public": False,
+                    },
+                    # Публичная, от пользователя user2 в проекте project3
+                    {
+                        "original_url": "https://example.com/link5",
+                        "short_code": "link5",
+                        "owner_id": user2.id,
+                        "project_id": project3.id,
+                        "is_public": True,
+                    },
+                    # Приватная, от пользователя user2 в проекте project3
+                    {
+                        "original_url": "https://example.com/link6",
+                        "short_code": "link6",
+                        "owner_id": user2.id,
+                        "project_id": project3.id,
+                        "is_public": False,
+                    },
+                    {
+                        "original_url": "http://team22.ykdns.net/",
+                        "short_code": "team22",
+                        "owner_id": user1.id,
+                        "project_id": project1.id,
+                        "is_public": True,
+                    },
+                ]
+            )
 
-        logger.debug(f"""\n
+        logger.debug(
+            f"""\n
 =============== ДЕМОНСТРАЦИОННЫЕ ДАННЫЕ СОЗДАНЫ ===============
 Пользователи:
 - admin@example.com / password123 / {admin_user.id}
@@ -221,22 +247,14 @@ async def create_demo_data() -> bool:
 - {project2}
 - {project3}
 Ссылки:
-- {link1}
-- {link2}
-- {link3}
-- {link4}
-- {link5}
-- {link6}
-- {link22}""")
+"""
+            + "\n".join(f"- {link}" for link in links)
+        )
 
         return True
     except Exception as e:
         logger.error(f"Ошибка при создании демонстрационных данных: {e}")
-        raise e
-        return False
-    finally:
-        # Завершаем транзакцию
-        await session.commit()
+        raise
 
 
 if __name__ == "__main__":
@@ -1,9 +1,19 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Annotated, Optional
 
+from pydantic import AfterValidator
 
-def ensure_timezone(dt: Optional[datetime]) -> Optional[datetime]:
+_UTC = timezone.utc
+
+
+def ensure_timezone(
+    dt: Optional[datetime], _utc: timezone = _UTC
+) -> Optional[datetime]:
     """Убедиться, что дата содержит информацию о часовом поясе UTC."""
-    if dt and dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt
\ No newline at end of file
+    if dt is None or dt.tzinfo is not None:
+        return dt
+    return dt.replace(tzinfo=_utc)
+
+
+# Дата со временем, к которой при валидации добавляется часовой пояс UTC
+UTCDatetime = Annotated[datetime, AfterValidator(ensure_timezone)]
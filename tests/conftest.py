@@ -4,18 +4,33 @@ import asyncio
 from typing import AsyncGenerator, Generator
 import pytest
 import pytest_asyncio
+from pytest_asyncio import is_async_test
 from fastapi import FastAPI
-from httpx import AsyncClient  # Используем AsyncClient т.к. приложение асинхронное
+from httpx import (  # Используем AsyncClient т.к. приложение асинхронное
+    ASGITransport,
+    AsyncClient,
+)
 from alembic import command
 from alembic.config import Config
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.pool import NullPool
+from sqlalchemy import make_url, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from pydantic_settings import SettingsConfigDict
+from dotenv import load_dotenv
+
+# uvloop ускоряет цикл событий, но доступен не на всех платформах
+try:
+    import uvloop
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
 
 # Добавляем корневую директорию проекта (где находится папка src) в PYTHONPATH
 # Это позволит pytest находить модули из src
@@ -24,18 +39,39 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
     print(f"Added project root to sys.path: {project_root}")
 
+# Загружаем .env.test до первого импорта src: настройки создаются при импорте
+# src.core.config, поэтому переменные должны быть в окружении заранее.
+# Модуль импортируется один раз на процесс (и на каждый воркер pytest-xdist)
+_env_test_path = os.path.join(project_root, ".env.test")
+if not load_dotenv(dotenv_path=_env_test_path, override=True):
+    raise pytest.UsageError(".env.test not found, cannot run tests.")
+
+# При запуске через pytest-xdist (pytest -n auto --dist loadfile) каждый воркер
+# работает со своей копией тестовой БД: <DB_NAME>_<worker>, например
+# url_shortener_test_gw0. Имя подменяется до создания настроек, поэтому
+# движок, приложение и Alembic используют БД воркера. Сама БД создается
+# в test_async_engine; пользователю БД нужно право CREATEDB
+_base_db_name = os.environ.get("DB_NAME")
+_xdist_worker = os.environ.get("PYTEST_XDIST_WORKER")
+if _xdist_worker:
+    os.environ["DB_NAME"] = f"{_base_db_name}_{_xdist_worker}"
+
 from src.models.user import User
 from src.models.project import Project
 from src.models.link import Link
 
 # Импортируем наши фикстуры для тестовых данных
 from tests.fixtures import (
+    seeded_defaults,
+    factory,
     test_user,
     test_admin_user,
     test_project,
     test_project_with_members,
     test_link,
     test_links,
+    shared_owner,
+    shared_project,
 )
 
 
@@ -46,49 +82,23 @@ def models():
     return {"User": User, "Link": Link, "Project": Project}
 
 
-@pytest.fixture(scope="session")
-def event_loop():
+def pytest_collection_modifyitems(items):
     """
-    Создает цикл событий для всей тестовой сессии.
-    Переопределяет встроенную фикстуру pytest_asyncio, которая создает отдельный цикл событий для каждого теста.
+    Запускает все асинхронные тесты в общем цикле событий тестовой сессии,
+    в котором созданы движок БД и остальные фикстуры с областью "session".
     """
-    policy = asyncio.get_event_loop_policy()
-    loop = policy.new_event_loop()
-    asyncio.set_event_loop(loop)
-    yield loop
-
-    # Явно закрываем все незавершенные задачи
-    pending = asyncio.all_tasks(loop)
-    for task in pending:
-        task.cancel()
-
-    # Запускаем цикл, чтобы задачи отменились
-    if pending and not loop.is_closed():
-        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-
-    # Закрываем цикл
-    if not loop.is_closed():
-        loop.close()
+    session_scope_marker = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_scope_marker, append=False)
 
 
 @pytest.fixture(scope="session", autouse=True)
 def set_test_environment():
     """
-    Настраивает Pydantic Settings на использование .env.test для всей сессии.
-    Загружает переменные окружения из .env.test ДО импорта settings.
+    Проверяет, что Pydantic Settings загружены из .env.test.
+    Сами переменные окружения загружаются при импорте conftest.py.
     """
-    # Самый простой способ, если Pydantic Settings > 2.0:
-    # Загрузить тестовые переменные и затем импортировать settings
-    from dotenv import load_dotenv
-
-    print("Loading .env.test for Pydantic Settings...")
-    loaded = load_dotenv(dotenv_path=".env.test", override=True)
-    if not loaded:
-        print("Warning: .env.test not found or empty.")
-        pytest.fail(".env.test not found, cannot run tests.")
-
-    # Теперь импортируем settings ПОСЛЕ загрузки .env.test
-    # Это требует, чтобы config.py не импортировался где-либо еще до этой фикстуры
     from src.core.config import settings
 
     # Проверка ключевой переменной (теперь из settings)
@@ -101,11 +111,38 @@ def set_test_environment():
 # --- Фикстуры для управления тестовой базой данных ---
 
 
+async def _create_database_if_missing(db_url: str, admin_db_name: str) -> None:
+    """
+    Создает БД из db_url, если ее еще нет.
+    CREATE DATABASE нельзя выполнить в транзакции, поэтому запрос идет
+    через отдельное соединение с базовой БД в режиме AUTOCOMMIT.
+    """
+    url = make_url(db_url)
+    admin_engine = create_async_engine(
+        url.set(database=admin_db_name),
+        isolation_level="AUTOCOMMIT",
+        poolclass=NullPool,
+    )
+    try:
+        async with admin_engine.connect() as conn:
+            exists = await conn.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": url.database},
+            )
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{url.database}"'))
+                print(f"Worker database {url.database} created.")
+    finally:
+        await admin_engine.dispose()
+
+
 @pytest_asyncio.fixture(scope="session")
-async def test_async_engine(event_loop) -> AsyncGenerator[AsyncEngine, None]:
+async def test_async_engine() -> AsyncGenerator[AsyncEngine, None]:
     """
     Создает и предоставляет асинхронный движок SQLAlchemy для тестовой БД.
-    Использует NullPool для предотвращения зависания соединений в тестах.
+    Движок и пул соединений живут в общем цикле событий тестовой сессии,
+    поэтому соединения переиспользуются между тестами без повторного
+    подключения к Postgres.
     Использует DATABASE_URL из настроек Pydantic.
     """
     # Импортируем здесь, чтобы убедиться, что .env.test загружен
@@ -113,7 +150,18 @@ async def test_async_engine(event_loop) -> AsyncGenerator[AsyncEngine, None]:
 
     # Используем правильное свойство для асинхронного DSN
     test_db_url = settings.database_dsn_async
-    engine = create_async_engine(test_db_url, poolclass=NullPool, echo=settings.DB_ECHO)
+    if _xdist_worker:
+        await _create_database_if_missing(test_db_url, _base_db_name)
+    engine = create_async_engine(
+        test_db_url,
+        poolclass=AsyncAdaptedQueuePool,
+        # Тесты работают на одном общем соединении (test_db_connection),
+        # второе постоянное соединение нужно сессиям тестового клиента (test_app)
+        pool_size=2,
+        # Локальная тестовая БД: проверка соединения перед выдачей не нужна
+        pool_pre_ping=False,
+        echo=settings.DB_ECHO,
+    )
     print("Test engine created.")
     yield engine
     print("Disposing test engine...")
@@ -121,19 +169,30 @@ async def test_async_engine(event_loop) -> AsyncGenerator[AsyncEngine, None]:
     print("Test engine disposed.")
 
 
-@pytest.fixture(scope="session", autouse=True)
-def apply_migrations_to_test_db(test_async_engine: AsyncEngine, event_loop):
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def apply_migrations_to_test_db(test_async_engine: AsyncEngine):
     """
-    Применяет миграции Alembic к тестовой БД перед началом тестовой сессии.
+    Создает схему тестовой БД перед началом тестовой сессии.
+    По умолчанию схема создается напрямую из метаданных моделей одним
+    пакетом DDL. Для проверки самих миграций Alembic установите
+    переменную окружения TEST_USE_ALEMBIC=1.
     Запускается автоматически благодаря autouse=True.
     """
-    print("Applying migrations...")
-    alembic_cfg = Config("alembic.ini")
-    # Alembic должен использовать DATABASE_URL из окружения,
-    # которое было установлено через load_dotenv в `set_test_environment`.
-    # Убедитесь, что ваш alembic/env.py читает DATABASE_URL из os.environ.
-    command.upgrade(alembic_cfg, "head")
-    print("Migrations applied.")
+    if os.environ.get("TEST_USE_ALEMBIC") == "1":
+        print("Applying migrations...")
+        alembic_cfg = Config("alembic.ini")
+        # Alembic должен использовать DATABASE_URL из окружения,
+        # которое было установлено через load_dotenv в `set_test_environment`.
+        # Убедитесь, что ваш alembic/env.py читает DATABASE_URL из os.environ.
+        command.upgrade(alembic_cfg, "head")
+        print("Migrations applied.")
+    else:
+        from src.core.database import Base
+
+        print("Creating tables from models metadata...")
+        async with test_async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        print("Tables created.")
     yield
     # Опционально: откат миграций после тестов или очистка таблиц
     # print("Downgrading migrations...")
@@ -154,26 +213,48 @@ async def TestDBSessionFactory(
     )
 
 
+@pytest_asyncio.fixture(scope="session")
+async def test_db_connection(
+    test_async_engine: AsyncEngine, apply_migrations_to_test_db
+) -> AsyncGenerator[AsyncConnection, None]:
+    """
+    Открывает одно соединение с тестовой БД на всю тестовую сессию.
+    На соединении начинается внешняя транзакция, которая откатывается
+    в конце сессии, поэтому данные тестов никогда не фиксируются.
+    Тесты не открывают собственных соединений, а работают в SAVEPOINT
+    внутри этой транзакции (см. db_session).
+    """
+    async with test_async_engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            yield connection
+        finally:
+            await transaction.rollback()
+
+
 @pytest_asyncio.fixture
 async def db_session(
-    TestDBSessionFactory: async_sessionmaker[AsyncSession],
+    test_db_connection: AsyncConnection,
 ) -> AsyncGenerator[AsyncSession, None]:
     """
     Предоставляет транзакционную сессию БД для каждого теста.
-    Создает новую сессию и транзакцию для каждого теста.
-    После теста всегда выполняет rollback для изоляции тестов.
+    Для теста открывается SAVEPOINT на общем соединении сессии,
+    а commit() и rollback() в тестах работают с вложенными SAVEPOINT внутри него.
+    После теста SAVEPOINT откатывается, поэтому данные теста
+    не видны следующим тестам.
     """
-    # Создаем новую сессию для каждого теста
-    async with TestDBSessionFactory() as session:
-        # Начинаем транзакцию
-        await session.begin()
-        try:
-            yield session
-        finally:
-            # Всегда откатываем транзакцию, даже если тест завершился с ошибкой
-            await session.rollback()
-            # Закрываем сессию
-            await session.close()
+    savepoint = await test_db_connection.begin_nested()
+    session = AsyncSession(
+        bind=test_db_connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    try:
+        yield session
+    finally:
+        # Всегда откатываем SAVEPOINT, даже если тест завершился с ошибкой
+        await session.close()
+        await savepoint.rollback()
 
 
 # --- Фикстуры для тестового клиента FastAPI ---
@@ -214,6 +295,10 @@ async def client(test_app: FastAPI) -> AsyncGenerator[AsyncClient, None]:
     """
     Предоставляет асинхронный HTTP клиент (httpx) для взаимодействия с тестовым приложением FastAPI.
     """
-    async with AsyncClient(app=test_app, base_url="http://testserver") as async_client:
+    # ASGITransport вызывает ASGI-приложение напрямую, без сетевого слоя
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(
+        transport=transport, base_url="http://testserver"
+    ) as async_client:
         print("Async test client created.")
         yield async_client
@@ -1,57 +1,70 @@
 import pytest
 import pytest_asyncio
-from typing import List
-from sqlalchemy.ext.asyncio import AsyncSession
-from uuid import uuid4
+from typing import AsyncGenerator, List
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
 from src.models.user import User
 from src.models.project import Project
 from src.models.link import Link
+from src.utils.cache import CacheManager, cache_manager
 from tests.helpers import (
-    create_test_user,
     create_test_project,
-    create_test_link,
     create_multiple_test_links,
-    create_test_project_with_members,
-    add_user_to_project,
+    TestDataFactory,
 )
 
 
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def seeded_defaults(test_db_connection: AsyncConnection) -> TestDataFactory:
+    """
+    Создает стандартный набор тестовых данных один раз на тестовую сессию.
+    Данные записываются во внешнюю транзакцию общего соединения до того,
+    как откроется первый SAVEPOINT теста или модуля (поэтому autouse),
+    и откатываются вместе с ней в конце сессии.
+    Объекты отсоединены от сессии: в тестах используйте фикстуру factory.
+    """
+    async with AsyncSession(
+        bind=test_db_connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    ) as session:
+        data = await TestDataFactory(session).bulk_create_defaults()
+        # Фиксируем SAVEPOINT сессии во внешней транзакции,
+        # иначе закрытие сессии откатит данные
+        await session.commit()
+    return data
+
+
 @pytest_asyncio.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Создает тестового пользователя."""
-    return await create_test_user(
-        db=db_session,
-        is_superuser=False,
-        email="test_user@example.com",
-        password="test_password",
-        is_active=True,
-        is_verified=False,
+async def factory(
+    db_session: AsyncSession, seeded_defaults: TestDataFactory
+) -> TestDataFactory:
+    """
+    Загружает стандартный набор тестовых данных в сессию теста.
+    Строки создаются один раз на сессию, поэтому тест выполняет только
+    два SELECT, а его изменения откатываются вместе с SAVEPOINT теста.
+    """
+    return await TestDataFactory(db_session).load_defaults(
+        seeded_defaults.link.id, seeded_defaults.admin.id
     )
 
 
 @pytest_asyncio.fixture
-async def test_admin_user(db_session: AsyncSession) -> User:
-    """Создает тестового пользователя-администратора."""
-    return await create_test_user(
-        db=db_session,
-        is_superuser=True,
-        email="admin@example.com",
-        password="admin_password",
-        is_active=True,
-        is_verified=True,
-    )
+async def test_user(factory: TestDataFactory) -> User:
+    """Тестовый пользователь из стандартного набора данных."""
+    return factory.user
 
 
 @pytest_asyncio.fixture
-async def test_project(db_session: AsyncSession, test_user: User) -> Project:
-    """Создает тестовый проект."""
-    return await create_test_project(
-        db=db_session,
-        name="Test Project",
-        description="Test project description",
-        owner=test_user,
-    )
+async def test_admin_user(factory: TestDataFactory) -> User:
+    """Тестовый пользователь-администратор из стандартного набора данных."""
+    return factory.admin
+
+
+@pytest_asyncio.fixture
+async def test_project(factory: TestDataFactory) -> Project:
+    """Тестовый проект из стандартного набора данных."""
+    return factory.project
 
 
 @pytest_asyncio.fixture
@@ -69,17 +82,9 @@ async def test_project_with_members(
 
 
 @pytest_asyncio.fixture
-async def test_link(
-    db_session: AsyncSession, test_user: User, test_project: Project
-) -> Link:
-    """Создает тестовую ссылку."""
-    return await create_test_link(
-        db=db_session,
-        original_url="https://example.com/test",
-        short_code=f"test_{uuid4().hex[:8]}",
-        owner=test_user,
-        project=test_project,
-    )
+async def test_link(factory: TestDataFactory) -> Link:
+    """Тестовая ссылка из стандартного набора данных."""
+    return factory.link
 
 
 @pytest_asyncio.fixture
@@ -93,3 +98,63 @@ async def test_links(
         owner=test_user,
         project=test_project,
     )
+
+
+@pytest_asyncio.fixture(scope="module")
+async def shared_project(test_db_connection: AsyncConnection) -> Project:
+    """
+    Создает проект с владельцем один раз на модуль.
+    Данные записываются в SAVEPOINT модуля, внутри которого открываются
+    SAVEPOINT отдельных тестов, и откатываются после последнего теста модуля.
+    Сессия закрывается сразу после создания данных: объекты отсоединены
+    от нее, поэтому в тестах используйте их id, а не ленивые связи.
+    """
+    savepoint = await test_db_connection.begin_nested()
+    try:
+        async with AsyncSession(
+            bind=test_db_connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        ) as session:
+            project = await create_test_project(session, name="Shared Project")
+            # Фиксируем SAVEPOINT сессии в SAVEPOINT модуля,
+            # иначе закрытие сессии откатит данные
+            await session.commit()
+        yield project
+    finally:
+        await savepoint.rollback()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def shared_owner(shared_project: Project) -> User:
+    """Владелец проекта shared_project, создается один раз на модуль."""
+    return shared_project.owner
+
+
+@pytest_asyncio.fixture
+async def redis_cache() -> AsyncGenerator[CacheManager, None]:
+    """
+    Подключает глобальный cache_manager к Redis из настроек на время теста.
+    Если Redis недоступен, тест пропускается. После теста менеджер
+    отключается, и остальные тесты по-прежнему работают без кэша.
+    """
+    await cache_manager.init()
+    try:
+        await cache_manager.redis.ping()
+    except Exception as e:
+        await _disconnect_cache_manager()
+        pytest.skip(f"Redis недоступен: {e}")
+    try:
+        yield cache_manager
+    finally:
+        await _disconnect_cache_manager()
+
+
+async def _disconnect_cache_manager() -> None:
+    """
+    Закрывает соединения cache_manager и возвращает его в неинициализированное состояние.
+    """
+    await cache_manager.close()
+    cache_manager.redis = None
+    cache_manager.pool = None
+    cache_manager.backend = None
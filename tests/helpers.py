@@ -1,22 +1,50 @@
 import uuid
-from uuid import uuid4
-from typing import Optional, List, Union
+from contextlib import contextmanager
+from typing import Iterator, Optional, List, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, select
-from sqlalchemy.orm import selectinload
-from sqlalchemy.exc import IntegrityError
-from datetime import datetime
+from sqlalchemy import Row, bindparam, event, insert, select
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 import random
 import string
+import time
+from itertools import count
 
 from src.models.user import User
-from src.models.project import Project
-from src.models.link import Link
+from src.models.project import Project, project_members
+from src.models.link import Link, utcnow_with_tz
+
+
+# Запрос добавления участника проекта создается один раз через Core insert():
+# он использует кэш скомпилированных запросов SQLAlchemy и значения
+# по умолчанию столбцов таблицы (joined_at), в отличие от text()
+_ADD_MEMBER_INSERT = insert(project_members)
+
+# Пакетная вставка ссылок тоже строится один раз: SQLAlchemy берет
+# скомпилированный запрос из кэша, не собирая конструкцию заново
+_LINK_INSERT = insert(Link).returning(Link, sort_by_parameter_order=True)
+
+# Алфавит и генератор связаны на уровне модуля, чтобы не искать их при каждом вызове
+_ALPHA = string.ascii_lowercase
+_CHOICES = random.choices
+
+
+# Единственный источник уникальных значений в тестах (email, названия, коды).
+# Монотонный счетчик уникален в процессе, а начальное значение
+# из time.time_ns() разводит значения разных запусков
+_unique_counter = count(time.time_ns())
+
+
+def unique_id() -> str:
+    """
+    Возвращает уникальную в процессе шестнадцатеричную строку для email и коротких кодов.
+    В отличие от uuid4().hex не требует системного вызова urandom.
+    """
+    return f"{next(_unique_counter):x}"
 
 
 def generate_random_string(length: int = 8) -> str:
     """Генерирует случайную строку заданной длины."""
-    return "".join(random.choice(string.ascii_lowercase) for _ in range(length))
+    return "".join(_CHOICES(_ALPHA, k=length))
 
 
 async def create_test_user(
@@ -46,7 +74,7 @@ async def create_test_user(
         Созданный экземпляр User
     """
     # Создаем уникальный email, даже если предоставлен конкретный email
-    unique_suffix = f"_{uuid.uuid4().hex[:8]}"
+    unique_suffix = f"_{unique_id()}"
 
     if email:
         # Если email указан, сделаем его уникальным, добавив суффикс перед @
@@ -58,9 +86,7 @@ async def create_test_user(
             email = f"{email}{unique_suffix}@example.com"
     else:
         # Если email не указан, генерируем полностью
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        random_string = generate_random_string(5)
-        email = f"test_user_{timestamp}_{random_string}@example.com"
+        email = f"test_user_{unique_id()}@example.com"
 
     # В моделе используется is_superuser вместо is_admin
     if is_admin:
@@ -78,32 +104,72 @@ async def create_test_user(
     # Добавляем в сессию
     db.add(user)
 
-    # Если auto_flush=True, делаем flush чтобы получить id
+    # Если auto_flush=True, делаем flush чтобы получить id.
+    # Случайный суффикс делает email уникальным, повторная попытка не нужна
     if auto_flush:
-        try:
-            await db.flush()
-        except IntegrityError as e:
-            await db.rollback()
-            # Если проблема с уникальностью, пробуем еще раз с новым email
-            if "duplicate key" in str(e) and "email" in str(e):
-                print(f"Email {email} conflict, retrying with new random values")
-                return await create_test_user(
-                    db=db,
-                    is_admin=is_admin,
-                    # Не передаем email, чтобы сгенерировать полностью новый
-                    password=password,
-                    is_active=is_active,
-                    is_superuser=is_superuser,
-                    is_verified=is_verified,
-                    auto_flush=auto_flush,
-                )
-            else:
-                # Если какая-то другая ошибка, просто пробрасываем её выше
-                raise
+        await db.flush()
 
     return user
 
 
+async def create_test_users(
+    db: AsyncSession, count: int, auto_flush: bool = True
+) -> List[User]:
+    """
+    Создает несколько тестовых пользователей.
+    Пользователи не сохраняются по отдельности: общий flush отправляет
+    их одним пакетным INSERT вместо отдельного запроса на каждого.
+
+    Args:
+        db: Асинхронная сессия БД
+        count: Количество создаваемых пользователей
+        auto_flush: Автоматически вызывать db.flush() после создания
+
+    Returns:
+        Список созданных пользователей
+    """
+    # AsyncSession нельзя использовать из нескольких корутин одновременно,
+    # поэтому вместо asyncio.gather объединяем вставки в один flush
+    users = [await create_test_user(db, auto_flush=False) for _ in range(count)]
+
+    if auto_flush and users:
+        await db.flush()
+
+    return users
+
+
+async def bulk_create_test_users(db: AsyncSession, count: int) -> List[Row]:
+    """
+    Создает несколько тестовых пользователей одним запросом INSERT ... RETURNING
+    без создания объектов User и без unit of work.
+    Подходит для тестов, которым нужны только id пользователей.
+
+    Args:
+        db: Асинхронная сессия БД
+        count: Количество создаваемых пользователей
+
+    Returns:
+        Список строк с полями id и email
+    """
+    if count <= 0:
+        return []
+
+    result = await db.execute(
+        insert(User).returning(User.id, User.email, sort_by_parameter_order=True),
+        [
+            {
+                "email": f"test_user_{unique_id()}@example.com",
+                "hashed_password": "test_password",
+                "is_active": True,
+                "is_superuser": False,
+                "is_verified": False,
+            }
+            for _ in range(count)
+        ],
+    )
+    return list(result.all())
+
+
 async def create_test_project(
     db: AsyncSession,
     name: Optional[str] = None,
@@ -132,19 +198,18 @@ async def create_test_project(
 
     # Генерируем название проекта, если не указано
     if not name:
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        random_string = generate_random_string(5)
-        name = f"Test Project {timestamp} {random_string}"
+        name = f"Test Project {unique_id()}"
 
     # Генерируем описание, если не указано
     if not description:
         description = f"Description for {name}"
 
-    # Создаем проект
+    # Создаем проект. Владелец задается через связь, чтобы проект можно было
+    # сохранить одним flush вместе с еще не сохраненным владельцем
     project = Project(
         name=name,
         description=description,
-        owner_id=owner.id,
+        owner=owner,
     )
 
     # Добавляем участников
@@ -162,6 +227,42 @@ async def create_test_project(
     return project
 
 
+async def add_users_to_project(db: AsyncSession, rows: List[dict]) -> None:
+    """
+    Добавляет несколько пользователей в проекты через промежуточную таблицу.
+    На PostgreSQL строки передаются командой COPY одним сообщением протокола,
+    на других СУБД - одним вызовом executemany.
+
+    Args:
+        db: Асинхронная сессия БД
+        rows: Словари с ключами project_id, user_id и is_admin
+    """
+    if not rows:
+        return
+
+    connection = await db.connection()
+    if connection.dialect.name != "postgresql":
+        # Запрос выполняется сразу, отдельный flush не нужен
+        await db.execute(_ADD_MEMBER_INSERT, rows)
+        return
+
+    # COPY идет мимо сессии, поэтому сначала сохраняем еще не отправленные
+    # проекты и пользователей, на которые ссылаются строки
+    await db.flush()
+    # COPY не применяет значения по умолчанию SQLAlchemy, поэтому
+    # joined_at задаем явно, как это сделал бы insert()
+    joined_at = utcnow_with_tz()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        project_members.name,
+        records=[
+            (row["project_id"], row["user_id"], row["is_admin"], joined_at)
+            for row in rows
+        ],
+        columns=["project_id", "user_id", "is_admin", "joined_at"],
+    )
+
+
 async def add_user_to_project(
     db: AsyncSession, project_id: int, user_id: uuid.UUID, is_admin: bool = False
 ) -> None:
@@ -174,14 +275,9 @@ async def add_user_to_project(
         user_id: ID пользователя
         is_admin: Флаг администратора проекта
     """
-    stmt = text("""
-    INSERT INTO project_members (project_id, user_id, is_admin) 
-    VALUES (:project_id, :user_id, :is_admin)
-    """)
-    await db.execute(
-        stmt, {"project_id": project_id, "user_id": user_id, "is_admin": is_admin}
+    await add_users_to_project(
+        db, [{"project_id": project_id, "user_id": user_id, "is_admin": is_admin}]
     )
-    await db.flush()
 
 
 async def create_test_link(
@@ -206,38 +302,51 @@ async def create_test_link(
     Returns:
         Созданный экземпляр Link
     """
+    # Владелец и проект, созданные здесь, не сохраняются по отдельности:
+    # они попадут в БД вместе со ссылкой одним flush
+    has_pending = not owner or not project
+
     # Создаем владельца, если не указан
     if not owner:
-        owner = await create_test_user(db, auto_flush=True)
+        owner = await create_test_user(db, auto_flush=False)
 
     # Создаем проект, если не указан
     if not project:
-        project = await create_test_project(db, owner=owner, auto_flush=True)
+        project = await create_test_project(db, owner=owner, auto_flush=False)
+
+    # Генерируем URL и короткий код, если не указаны
+    suffix = unique_id()
 
-    # Генерируем URL, если не указан
     if not original_url:
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        random_string = generate_random_string(5)
-        original_url = f"https://example.com/{timestamp}/{random_string}"
+        original_url = f"https://example.com/{suffix}"
 
-    # Генерируем короткий код, если не указан
     if not short_code:
-        timestamp = datetime.now().strftime("%H%M%S")
-        random_string = generate_random_string(5)
-        short_code = f"test_{timestamp}_{random_string}"
+        short_code = f"test_{suffix}"
+
+    # Если владелец и проект уже сохранены, вставляем ссылку сразу:
+    # id и значения по умолчанию возвращаются через RETURNING в том же запросе
+    if auto_flush and not has_pending:
+        return await db.scalar(
+            insert(Link)
+            .values(
+                original_url=original_url,
+                short_code=short_code,
+                owner_id=owner.id,
+                project_id=project.id,
+            )
+            .returning(Link)
+        )
 
-    # Создаем ссылку
+    # Иначе добавляем в сессию; связи позволяют сохранить ссылку вместе
+    # с еще не сохраненными владельцем и проектом
     link = Link(
         original_url=original_url,
         short_code=short_code,
-        owner_id=owner.id,
-        project_id=project.id,
+        owner=owner,
+        project=project,
     )
-
-    # Добавляем в сессию
     db.add(link)
 
-    # Если auto_flush=True, делаем flush чтобы получить id
     if auto_flush:
         await db.flush()
 
@@ -262,22 +371,22 @@ async def create_test_project_with_members(
     Returns:
         Созданный экземпляр Project
     """
-    # Создаем владельца, если не передан
+    # Создаем владельца, если не передан: он сохранится вместе с проектом
     if owner is None:
-        owner = await create_test_user(db)
+        owner = await create_test_user(db, auto_flush=False)
 
-    # Создаем проект
+    # Создаем проект (один flush для проекта и нового владельца)
     project = await create_test_project(db, name=project_name, owner=owner)
 
-    # Добавляем владельца как участника-администратора
-    await add_user_to_project(db, project.id, owner.id, is_admin=True)
-
-    # Добавляем других участников, если переданы
-    if members:
-        for member in members:
-            await add_user_to_project(db, project.id, member.id)
+    # Добавляем владельца как участника-администратора и других участников,
+    # если переданы, одним пакетным запросом
+    values = [{"project_id": project.id, "user_id": owner.id, "is_admin": True}]
+    values += [
+        {"project_id": project.id, "user_id": member.id, "is_admin": False}
+        for member in members or []
+    ]
+    await add_users_to_project(db, values)
 
-    await db.flush()
     return project
 
 
@@ -286,6 +395,7 @@ async def create_multiple_test_links(
     count: int = 5,
     owner: Optional[User] = None,
     project: Optional[Project] = None,
+    original_urls: Optional[List[str]] = None,
 ) -> List[Link]:
     """
     Создает несколько тестовых ссылок.
@@ -295,6 +405,7 @@ async def create_multiple_test_links(
         count: Количество создаваемых ссылок
         owner: Пользователь-владелец ссылок
         project: Проект, к которому относятся ссылки
+        original_urls: URL ссылок; если указаны, count равен их количеству
 
     Returns:
         Список созданных ссылок
@@ -305,19 +416,26 @@ async def create_multiple_test_links(
     if not project:
         project = await create_test_project(db, owner=owner, auto_flush=True)
 
-    links = []
-    for i in range(count):
-        link = await create_test_link(
-            db=db,
-            original_url=f"https://example.com/link_{i}",
-            short_code=f"test_{i}_{generate_random_string(5)}",
-            owner=owner,
-            project=project,
-            auto_flush=True,
-        )
-        links.append(link)
-
-    return links
+    if original_urls is None:
+        original_urls = [f"https://example.com/link_{i}" for i in range(count)]
+
+    if not original_urls:
+        return []
+
+    # Все ссылки вставляются одним запросом INSERT ... RETURNING
+    result = await db.scalars(
+        _LINK_INSERT,
+        [
+            {
+                "original_url": original_url,
+                "short_code": f"test_{i}_{generate_random_string(5)}",
+                "owner_id": owner.id,
+                "project_id": project.id,
+            }
+            for i, original_url in enumerate(original_urls)
+        ],
+    )
+    return list(result.all())
 
 
 async def get_user_with_links(db: AsyncSession, user_id: int) -> Optional[User]:
@@ -331,9 +449,11 @@ async def get_user_with_links(db: AsyncSession, user_id: int) -> Optional[User]:
     Returns:
         User или None, если пользователь не найден
     """
-    query = select(User).where(User.id == user_id).options(selectinload(User.links))
+    # Для одного пользователя JOIN дешевле: один запрос вместо двух.
+    # selectinload выгоднее, когда загружается сразу много пользователей
+    query = select(User).where(User.id == user_id).options(joinedload(User.links))
     result = await db.execute(query)
-    return result.scalars().first()
+    return result.unique().scalar_one_or_none()
 
 
 async def get_project_with_members(
@@ -352,7 +472,166 @@ async def get_project_with_members(
     query = (
         select(Project)
         .where(Project.id == project_id)
-        .options(selectinload(Project.members))
+        .options(joinedload(Project.members))
     )
     result = await db.execute(query)
-    return result.scalars().first()
+    return result.unique().scalar_one_or_none()
+
+
+# Запросы загрузки связей строятся один раз и выполняются с разными параметрами.
+# raiseload("*", sql_only=True) превращает обращение к незагруженной связи
+# в ошибку вместо лишнего запроса; связи из identity map остаются доступными
+PROJECT_WITH_LINKS = (
+    select(Project)
+    .where(Project.id == bindparam("project_id"))
+    .options(selectinload(Project.links), raiseload("*", sql_only=True))
+)
+PROJECT_WITH_MEMBERS = (
+    select(Project)
+    .where(Project.id == bindparam("project_id"))
+    .options(selectinload(Project.members), raiseload("*", sql_only=True))
+)
+PROJECT_WITH_MEMBER_PROJECTS = (
+    select(Project)
+    .where(Project.id == bindparam("project_id"))
+    .options(
+        selectinload(Project.members).selectinload(User.projects),
+        raiseload("*", sql_only=True),
+    )
+)
+USER_WITH_LINKS = (
+    select(User)
+    .where(User.id == bindparam("user_id"))
+    .options(selectinload(User.links), raiseload("*", sql_only=True))
+)
+USER_WITH_PROJECTS = (
+    select(User)
+    .where(User.id == bindparam("user_id"))
+    .options(selectinload(User.projects), raiseload("*", sql_only=True))
+)
+
+
+@contextmanager
+def count_queries(db: AsyncSession) -> Iterator[List[str]]:
+    """
+    Собирает SQL-запросы, выполненные движком сессии внутри блока with.
+    Позволяет проверить в тесте, что загрузка связей укладывается
+    в ожидаемое число запросов и не деградирует до N+1.
+
+    Args:
+        db: Асинхронная сессия БД, привязанная к соединению или движку
+
+    Yields:
+        Список текстов SQL, пополняемый по мере выполнения запросов
+    """
+    sync_engine = db.bind.sync_engine
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestDataFactory:
+    """
+    Фабрика стандартного набора тестовых данных.
+
+    Пользователь, администратор, проект и ссылка создаются при первом
+    обращении к фабрике пакетными запросами INSERT ... RETURNING:
+    по одному запросу на таблицу вместо отдельного flush на каждый объект.
+    Уже созданный набор можно загрузить в другую сессию через load_defaults.
+    """
+
+    # Не тестовый класс, pytest не должен его собирать
+    __test__ = False
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.user: Optional[User] = None
+        self.admin: Optional[User] = None
+        self.project: Optional[Project] = None
+        self.link: Optional[Link] = None
+
+    async def bulk_create_defaults(self) -> "TestDataFactory":
+        """
+        Создает стандартный набор данных, если он еще не создан.
+
+        Returns:
+            Эта же фабрика с заполненными атрибутами user, admin, project и link
+        """
+        if self.user is not None:
+            return self
+
+        # Как и в create_test_user, делаем email уникальными
+        unique_suffix = f"_{unique_id()}"
+        users = await self.db.scalars(
+            insert(User).returning(User, sort_by_parameter_order=True),
+            [
+                {
+                    "email": f"test_user{unique_suffix}@example.com",
+                    "hashed_password": "test_password",
+                    "is_active": True,
+                    "is_superuser": False,
+                    "is_verified": False,
+                },
+                {
+                    "email": f"admin{unique_suffix}@example.com",
+                    "hashed_password": "admin_password",
+                    "is_active": True,
+                    "is_superuser": True,
+                    "is_verified": True,
+                },
+            ],
+        )
+        self.user, self.admin = users.all()
+
+        self.project = await self.db.scalar(
+            insert(Project)
+            .values(
+                name="Test Project",
+                description="Test project description",
+                owner_id=self.user.id,
+            )
+            .returning(Project)
+        )
+
+        self.link = await self.db.scalar(
+            insert(Link)
+            .values(
+                original_url="https://example.com/test",
+                short_code=f"test_{unique_id()}",
+                owner_id=self.user.id,
+                project_id=self.project.id,
+            )
+            .returning(Link)
+        )
+
+        return self
+
+    async def load_defaults(
+        self, link_id: int, admin_id: uuid.UUID
+    ) -> "TestDataFactory":
+        """
+        Загружает в сессию фабрики стандартный набор, созданный ранее.
+        Ссылка загружается вместе с владельцем и проектом одним запросом с JOIN.
+
+        Args:
+            link_id: ID стандартной ссылки
+            admin_id: ID стандартного администратора
+
+        Returns:
+            Эта же фабрика с заполненными атрибутами user, admin, project и link
+        """
+        self.link = await self.db.scalar(
+            select(Link)
+            .where(Link.id == link_id)
+            .options(joinedload(Link.owner), joinedload(Link.project))
+        )
+        self.user, self.project = self.link.owner, self.link.project
+        self.admin = await self.db.get(User, admin_id)
+        return self
@@ -1,7 +1,5 @@
-import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
-from uuid import uuid4
 
 from src.models.link import Link, utcnow_with_tz
 from src.models.project import Project
@@ -10,29 +8,31 @@ from tests.helpers import (
     create_test_user,
     create_test_project,
     create_test_link,
+    unique_id,
 )
 from tests.fixtures import (
     test_user,
     test_project,
     test_link,
     test_links,
+    shared_owner,
+    shared_project,
 )
 
 
-@pytest.mark.asyncio
 class TestLinkModel:
     """Тесты для модели Link."""
 
     async def test_link_repr_method(
-        self, db_session: AsyncSession, test_user: User, test_project: Project
+        self, db_session: AsyncSession, shared_owner: User, shared_project: Project
     ):
         """Тестирует метод __repr__ модели Link."""
         # Создаем экземпляр Link с помощью вспомогательной функции
         link = await create_test_link(
             db=db_session,
             original_url="https://example.com",
-            owner=test_user,
-            project=test_project,
+            owner=shared_owner,
+            project=shared_project,
         )
 
         # Проверяем, что __repr__ возвращает строку с нужными данными
@@ -43,27 +43,25 @@ class TestLinkModel:
         assert repr_result == expected_repr
 
     async def test_create_link(
-        self, db_session: AsyncSession, test_user: User, test_project: Project
+        self, db_session: AsyncSession, shared_owner: User, shared_project: Project
     ):
         """Тест создания ссылки."""
         # Создаем ссылку с помощью вспомогательной функции
         link = await create_test_link(
             db=db_session,
             original_url="https://example.com",
-            owner=test_user,
-            project=test_project,
-            short_code=f"test123_{uuid4().hex[:8]}",
+            owner=shared_owner,
+            project=shared_project,
+            short_code=f"test123_{unique_id()}",
         )
 
-        await db_session.refresh(link)
-
         # Проверяем, что ссылка создана и имеет корректные поля
         assert link.id is not None
         assert isinstance(link.id, int)
         assert link.original_url == "https://example.com"
         assert link.short_code.startswith("test123_")
-        assert link.project_id == test_project.id
-        assert link.owner_id == test_user.id
+        assert link.project_id == shared_project.id
+        assert link.owner_id == shared_owner.id
         assert link.clicks_count == 0
         assert link.last_clicked_at is None
         assert link.created_at is not None
@@ -71,17 +69,17 @@ class TestLinkModel:
         assert link.created_at.tzinfo == timezone.utc
 
     async def test_read_link(
-        self, db_session: AsyncSession, test_user: User, test_project: Project
+        self, db_session: AsyncSession, shared_owner: User, shared_project: Project
     ):
         """Тест чтения ссылки."""
         # Создаем ссылку с помощью вспомогательной функции
-        short_code = f"test123_{uuid4().hex[:8]}"
+        short_code = f"test123_{unique_id()}"
         link = await create_test_link(
             db=db_session,
             original_url="https://example.com",
             short_code=short_code,
-            owner=test_user,
-            project=test_project,
+            owner=shared_owner,
+            project=shared_project,
         )
 
         # Получаем ссылку из базы данных
@@ -92,8 +90,8 @@ class TestLinkModel:
         assert retrieved_link.id == link.id
         assert retrieved_link.original_url == "https://example.com"
         assert retrieved_link.short_code == short_code
-        assert retrieved_link.project_id == test_project.id
-        assert retrieved_link.owner_id == test_user.id
+        assert retrieved_link.project_id == shared_project.id
+        assert retrieved_link.owner_id == shared_owner.id
 
     async def test_update_link(self, db_session: AsyncSession, test_link: Link):
         """Тест обновления ссылки."""
@@ -101,25 +99,24 @@ class TestLinkModel:
         test_link.original_url = "https://updated-example.com"
         test_link.is_public = True
 
-        await db_session.commit()
-        await db_session.refresh(test_link)
+        await db_session.flush()
 
         # Проверяем, что ссылка обновлена
         assert test_link.original_url == "https://updated-example.com"
         assert test_link.is_public is True
 
     async def test_delete_link(
-        self, db_session: AsyncSession, test_user: User, test_project: Project
+        self, db_session: AsyncSession, shared_owner: User, shared_project: Project
     ):
         """Тест удаления ссылки."""
         # Создаем ссылку с помощью вспомогательной функции
-        short_code = f"test123_{uuid4().hex[:8]}"
+        short_code = f"test123_{unique_id()}"
         link = await create_test_link(
             db=db_session,
             original_url="https://example.com",
             short_code=short_code,
-            owner=test_user,
-            project=test_project,
+            owner=shared_owner,
+            project=shared_project,
         )
 
         # Сохраняем ID для проверки
@@ -127,7 +124,7 @@ class TestLinkModel:
 
         # Удаляем ссылку
         await db_session.delete(link)
-        await db_session.commit()
+        await db_session.flush()
 
         # Проверяем, что ссылка удалена
         deleted_link = await db_session.get(Link, link_id)
@@ -138,9 +135,10 @@ class TestLinkModel:
         # Получаем текущее время с помощью функции
         now = utcnow_with_tz()
 
-        # Проверяем, что время имеет временную зону UTC
+        # Проверяем, что время имеет временную зону UTC: функция передает
+        # в datetime.now() сам объект timezone.utc, поэтому сравниваем по is
         assert isinstance(now, datetime)
-        assert now.tzinfo == timezone.utc
+        assert now.tzinfo is timezone.utc
 
     async def test_with_existing_fixtures(
         self, db_session: AsyncSession, test_links: list
@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.project import Project
+from src.models.user import User
+from src.services.link import LinkService
+from src.utils.cache import CacheManager, link_acl_cache_key, link_missing_cache_key
+from tests.helpers import (
+    create_test_project,
+    create_test_link,
+    unique_id,
+)
+from tests.fixtures import (
+    shared_owner,
+    shared_project,
+    redis_cache,
+)
+
+
+class TestLinkService:
+    """Тесты для сервиса ссылок LinkService."""
+
+    async def test_reserve_short_codes_skips_taken(
+        self,
+        db_session: AsyncSession,
+        shared_owner: User,
+        shared_project: Project,
+        monkeypatch,
+    ):
+        """Тест резервирования коротких кодов: занятые и исключенные коды пропускаются."""
+        existing = await create_test_link(
+            db=db_session, owner=shared_owner, project=shared_project
+        )
+        excluded = f"excl_{unique_id()}"
+        free = [f"free_{unique_id()}", f"free_{unique_id()}"]
+
+        # Кандидаты выдаются по порядку: сначала занятый в БД и исключенный коды
+        candidates = iter([existing.short_code, excluded, *free])
+        monkeypatch.setattr(
+            "src.services.link.random.choices", lambda chars, k: next(candidates)
+        )
+
+        service = LinkService(db_session)
+        reserved = await service._reserve_short_codes(2, exclude=[excluded])
+
+        assert sorted(reserved) == sorted(free)
+
+    async def test_bulk_create_links(
+        self, db_session: AsyncSession, shared_owner: User
+    ):
+        """Тест массового создания ссылок: порядок строк и срок жизни по умолчанию."""
+        # Проекты с разным сроком жизни ссылок по умолчанию
+        short_project = await create_test_project(db=db_session, owner=shared_owner)
+        long_project = await create_test_project(db=db_session, owner=shared_owner)
+        short_project.default_link_lifetime_days = 2
+        long_project.default_link_lifetime_days = 10
+        await db_session.flush()
+
+        explicit_code = f"bulk_{unique_id()}"
+        explicit_expires = datetime.now(timezone.utc) + timedelta(days=1)
+        rows = [
+            {
+                "original_url": f"https://example.com/{unique_id()}",
+                "owner_id": shared_owner.id,
+                "project_id": long_project.id,
+            },
+            {
+                "original_url": f"https://example.com/{unique_id()}",
+                "owner_id": shared_owner.id,
+                "project_id": short_project.id,
+                "short_code": explicit_code,
+                "expires_at": explicit_expires,
+            },
+            {
+                "original_url": f"https://example.com/{unique_id()}",
+                "owner_id": shared_owner.id,
+                "project_id": short_project.id,
+            },
+        ]
+
+        before = datetime.now(timezone.utc)
+        links = await LinkService(db_session).bulk_create_links(rows)
+        after = datetime.now(timezone.utc)
+
+        # RETURNING с sort_by_parameter_order возвращает строки в порядке входных данных
+        assert [link.original_url for link in links] == [
+            row["original_url"] for row in rows
+        ]
+        assert all(link.id is not None for link in links)
+
+        # Явно заданные код и срок сохраняются, сгенерированные коды уникальны
+        assert links[1].short_code == explicit_code
+        assert links[1].expires_at == explicit_expires
+        assert len({link.short_code for link in links}) == 3
+
+        # Для строк без expires_at срок берется из настроек своего проекта
+        for link, days in ((links[0], 10), (links[2], 2)):
+            lifetime = timedelta(days=days)
+            assert before + lifetime <= link.expires_at <= after + lifetime
+
+    async def test_bulk_create_links_unknown_project(
+        self, db_session: AsyncSession, shared_owner: User
+    ):
+        """Тест массового создания ссылок в несуществующем проекте."""
+        rows = [
+            {
+                "original_url": f"https://example.com/{unique_id()}",
+                "owner_id": shared_owner.id,
+                "project_id": -1,
+            }
+        ]
+
+        with pytest.raises(HTTPException) as exc_info:
+            await LinkService(db_session).bulk_create_links(rows)
+
+        assert exc_info.value.status_code == 404
+
+    async def test_acl_cache_hash_ttl_set_once(
+        self,
+        db_session: AsyncSession,
+        shared_owner: User,
+        shared_project: Project,
+        redis_cache: CacheManager,
+    ):
+        """Тест кэша прав доступа: один хэш на ссылку, TTL не продлевается записями."""
+        link = await create_test_link(
+            db=db_session, owner=shared_owner, project=shared_project
+        )
+        service = LinkService(db_session)
+        acl_key = link_acl_cache_key(link.short_code)
+        stranger_id = uuid4()
+
+        try:
+            assert await service._check_link_permissions(
+                link.short_code, shared_owner.id
+            ) == (True, True)
+            # Права хранятся битовой маской в поле пользователя
+            assert await redis_cache.hget(acl_key, str(shared_owner.id)) == "3"
+            assert 0 < await redis_cache.redis.ttl(acl_key) <= 300
+
+            # Запись прав другого пользователя не продлевает срок жизни хэша
+            await redis_cache.redis.expire(acl_key, 100)
+            assert await service._check_link_permissions(
+                link.short_code, stranger_id
+            ) == (False, False)
+            assert await redis_cache.hget(acl_key, str(stranger_id)) == "0"
+            assert await redis_cache.redis.ttl(acl_key) <= 100
+
+            # Повторная проверка берет права из кэша
+            assert await service._check_link_permissions(
+                link.short_code, shared_owner.id
+            ) == (True, True)
+        finally:
+            await redis_cache.delete_many([acl_key])
+
+    async def test_acl_cache_missing_link_separate_key(
+        self, db_session: AsyncSession, redis_cache: CacheManager
+    ):
+        """Тест кэша прав доступа: отсутствие ссылки хранится отдельным ключом."""
+        short_code = f"missing_{unique_id()}"
+        service = LinkService(db_session)
+        missing_key = link_missing_cache_key(short_code)
+
+        try:
+            assert await service._check_link_permissions(short_code, uuid4()) == (
+                False,
+                False,
+            )
+            assert await redis_cache.get(missing_key) is True
+            assert 0 < await redis_cache.redis.ttl(missing_key) <= 30
+            # Хэш прав доступа для несуществующей ссылки не создается
+            assert not await redis_cache.redis.exists(link_acl_cache_key(short_code))
+        finally:
+            await redis_cache.delete_many([missing_key])
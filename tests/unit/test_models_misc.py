@@ -1,16 +1,19 @@
-import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
 
 from src.models.user import User
 from src.models.project import Project
 from src.models.link import Link
 from tests.helpers import (
     create_test_user,
+    create_test_users,
     create_test_project,
-    create_test_link,
+    create_multiple_test_links,
     add_user_to_project,
+    add_users_to_project,
+    PROJECT_WITH_LINKS,
+    PROJECT_WITH_MEMBER_PROJECTS,
+    USER_WITH_LINKS,
+    USER_WITH_PROJECTS,
 )
 from tests.fixtures import (
     test_user,
@@ -22,121 +25,96 @@ from tests.fixtures import (
 )
 
 
-@pytest.mark.asyncio
 class TestModelsRelationships:
     """Тесты для проверки связей между моделями."""
 
     async def test_user_project_relationship(self, db_session: AsyncSession):
         """Проверка связи между пользователем и проектом."""
         # Создаем проект с владельцем и участниками
-        owner = await create_test_user(db=db_session)
-        member1 = await create_test_user(db=db_session)
-        member2 = await create_test_user(db=db_session)
+        owner, member1, member2 = await create_test_users(db=db_session, count=3)
 
         project = await create_test_project(
             db=db_session, name="Test Project", owner=owner
         )
 
-        # Добавляем пользователей в проект
-        await add_user_to_project(db_session, project.id, owner.id, is_admin=True)
-        await add_user_to_project(db_session, project.id, member1.id)
-        await add_user_to_project(db_session, project.id, member2.id)
+        # Добавляем пользователей в проект одним пакетным запросом
+        await add_users_to_project(
+            db_session,
+            [
+                {"project_id": project.id, "user_id": owner.id, "is_admin": True},
+                {"project_id": project.id, "user_id": member1.id, "is_admin": False},
+                {"project_id": project.id, "user_id": member2.id, "is_admin": False},
+            ],
+        )
 
-        await db_session.commit()
+        await db_session.flush()
 
-        # Загружаем проект с участниками
-        stmt = (
-            select(Project)
-            .where(Project.id == project.id)
-            .options(selectinload(Project.members))
+        # Загружаем проект с участниками и проектами участников одним запросом
+        result = await db_session.execute(
+            PROJECT_WITH_MEMBER_PROJECTS, {"project_id": project.id}
         )
-        result = await db_session.execute(stmt)
         project = result.scalar_one()
 
         # Проверяем, что есть участники
         assert len(project.members) == 3  # Владелец + 2 участника
 
-        # Загружаем пользователя с проектами
-        stmt = (
-            select(User)
-            .where(User.id == member1.id)
-            .options(selectinload(User.projects))
-        )
-        result = await db_session.execute(stmt)
-        user = result.scalar_one()
+        # Проекты участника уже загружены вместе с проектом
+        user = next(member for member in project.members if member.id == member1.id)
 
         # Проверяем, что у пользователя есть связь с проектом
         assert len(user.projects) == 1
         assert user.projects[0].id == project.id
 
-    async def test_project_links_relationship(self, db_session: AsyncSession):
+    async def test_project_links_relationship(
+        self,
+        db_session: AsyncSession,
+        shared_owner: User,
+        shared_project: Project,
+    ):
         """Проверка связи между проектом и ссылками."""
-        # Создаем все необходимые данные
-        user = await create_test_user(db=db_session)
-
-        project = await create_test_project(
-            db=db_session, name="Project with links", owner=user
-        )
-
-        # Создаем ссылки
-        link1 = await create_test_link(
-            db=db_session,
-            original_url="https://example.com/1",
-            owner=user,
-            project=project,
-        )
+        # Владелец и проект общие для модуля, тест создает только ссылки
+        user, project = shared_owner, shared_project
 
-        link2 = await create_test_link(
+        link1, link2 = await create_multiple_test_links(
             db=db_session,
-            original_url="https://example.com/2",
             owner=user,
             project=project,
+            original_urls=["https://example.com/1", "https://example.com/2"],
         )
 
-        await db_session.commit()
+        await db_session.flush()
 
         # Загружаем проект со ссылками
-        stmt = (
-            select(Project)
-            .where(Project.id == project.id)
-            .options(selectinload(Project.links))
+        result = await db_session.execute(
+            PROJECT_WITH_LINKS, {"project_id": project.id}
         )
-        result = await db_session.execute(stmt)
         project = result.scalar_one()
 
         # Проверяем, что у проекта есть ссылки
         assert len(project.links) == 2
         assert all(link.project_id == project.id for link in project.links)
 
-    async def test_user_links_relationship(self, db_session: AsyncSession):
+    async def test_user_links_relationship(
+        self,
+        db_session: AsyncSession,
+        shared_owner: User,
+        shared_project: Project,
+    ):
         """Проверка связи между пользователем и его ссылками."""
-        # Создаем все необходимые данные
-        user = await create_test_user(db=db_session)
+        # Владелец и проект общие для модуля, тест создает только ссылки
+        user, project = shared_owner, shared_project
 
-        project = await create_test_project(
-            db=db_session, name="Project for links", owner=user
-        )
-
-        # Создаем ссылки
-        link1 = await create_test_link(
+        link1, link2 = await create_multiple_test_links(
             db=db_session,
-            original_url="https://example.com/1",
             owner=user,
             project=project,
+            original_urls=["https://example.com/1", "https://example.com/2"],
         )
 
-        link2 = await create_test_link(
-            db=db_session,
-            original_url="https://example.com/2",
-            owner=user,
-            project=project,
-        )
-
-        await db_session.commit()
+        await db_session.flush()
 
         # Загружаем пользователя со ссылками
-        stmt = select(User).where(User.id == user.id).options(selectinload(User.links))
-        result = await db_session.execute(stmt)
+        result = await db_session.execute(USER_WITH_LINKS, {"user_id": user.id})
         user = result.scalar_one()
 
         # Проверяем, что у пользователя есть ссылки
@@ -161,13 +139,10 @@ class TestModelsRelationships:
             db_session, project_id=project.id, user_id=admin.id, is_admin=True
         )
 
-        await db_session.commit()
+        await db_session.flush()
 
         # Загружаем админа с проектами
-        stmt = (
-            select(User).where(User.id == admin.id).options(selectinload(User.projects))
-        )
-        result = await db_session.execute(stmt)
+        result = await db_session.execute(USER_WITH_PROJECTS, {"user_id": admin.id})
         admin_user = result.scalar_one()
 
         # Проверяем доступ к проекту
@@ -189,16 +164,18 @@ class TestModelsRelationships:
         )
 
         # Добавляем пользователя как участника проектов
-        await add_user_to_project(db_session, project1.id, user.id, is_admin=True)
-        await add_user_to_project(db_session, project2.id, user.id, is_admin=True)
+        await add_users_to_project(
+            db_session,
+            [
+                {"project_id": project1.id, "user_id": user.id, "is_admin": True},
+                {"project_id": project2.id, "user_id": user.id, "is_admin": True},
+            ],
+        )
 
-        await db_session.commit()
+        await db_session.flush()
 
         # Загружаем пользователя с проектами
-        stmt = (
-            select(User).where(User.id == user.id).options(selectinload(User.projects))
-        )
-        result = await db_session.execute(stmt)
+        result = await db_session.execute(USER_WITH_PROJECTS, {"user_id": user.id})
         user = result.scalar_one()
 
         # Проверяем, что пользователь связан с обоими проектами
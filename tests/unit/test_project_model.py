@@ -1,18 +1,17 @@
-import pytest
-from uuid import uuid4
 from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy import select
 
 from src.models.project import Project
 from src.models.user import User
-from src.models.link import Link
 from tests.helpers import (
-    create_test_user,
+    bulk_create_test_users,
     create_test_project,
-    create_test_link,
-    add_user_to_project,
+    create_multiple_test_links,
+    add_users_to_project,
+    count_queries,
+    PROJECT_WITH_LINKS,
+    PROJECT_WITH_MEMBERS,
+    PROJECT_WITH_MEMBER_PROJECTS,
 )
 from tests.fixtures import (
     test_user,
@@ -22,7 +21,6 @@ from tests.fixtures import (
 )
 
 
-@pytest.mark.asyncio
 class TestProjectModel:
     """Тесты для модели Project."""
 
@@ -38,8 +36,7 @@ class TestProjectModel:
         )
 
         db_session.add(project)
-        await db_session.commit()
-        await db_session.refresh(project)
+        await db_session.flush()
 
         # Проверяем, что проект создан и имеет корректные поля
         assert project.id is not None
@@ -85,8 +82,7 @@ class TestProjectModel:
         project.name = "Проект после обновления"
         project.description = "Новое описание"
 
-        await db_session.commit()
-        await db_session.refresh(project)
+        await db_session.flush()
 
         # Проверяем, что проект обновлен
         assert project.name == "Проект после обновления"
@@ -106,7 +102,7 @@ class TestProjectModel:
 
         # Удаляем проект
         await db_session.delete(project)
-        await db_session.commit()
+        await db_session.flush()
 
         # Проверяем, что проект удален
         deleted_project = await db_session.get(Project, project_id)
@@ -124,29 +120,22 @@ class TestProjectModel:
             owner=test_user,
         )
 
-        # Создаем ссылки для проекта
-        link1 = await create_test_link(
+        link1, link2 = await create_multiple_test_links(
             db=db_session,
-            original_url="https://example.com/1",
             owner=test_user,
             project=project,
+            original_urls=["https://example.com/1", "https://example.com/2"],
         )
 
-        link2 = await create_test_link(
-            db=db_session,
-            original_url="https://example.com/2",
-            owner=test_user,
-            project=project,
-        )
-
-        # Используем selectinload для жадной загрузки связей
-        stmt = (
-            select(Project)
-            .where(Project.id == project.id)
-            .options(selectinload(Project.links))
-        )
-        result = await db_session.execute(stmt)
-        project = result.scalar_one()
+        # Используем selectinload для жадной загрузки связей: запрос проекта
+        # и один запрос ссылок, обратная связь берется из identity map
+        with count_queries(db_session) as queries:
+            result = await db_session.execute(
+                PROJECT_WITH_LINKS, {"project_id": project.id}
+            )
+            project = result.scalar_one()
+            links_project_names = [link.project.name for link in project.links]
+        assert len(queries) <= 2
 
         # Проверяем связь с ссылками
         assert len(project.links) == 2
@@ -157,19 +146,12 @@ class TestProjectModel:
             link.original_url == "https://example.com/2" for link in project.links
         )
 
-        # Получаем ссылки напрямую для проверки обратной связи
-        stmt = (
-            select(Link)
-            .where(Link.id.in_([link1.id, link2.id]))
-            .options(selectinload(Link.project))
-        )
-        result = await db_session.execute(stmt)
-        links = result.scalars().all()
-
-        # Проверяем связь в обратном направлении
-        for link in links:
+        # Проверяем связь в обратном направлении. Отдельный запрос не нужен:
+        # ссылки уже загружены, а проект для link.project берется из identity map
+        assert {link.id for link in project.links} == {link1.id, link2.id}
+        for link in project.links:
             assert link.project_id == project.id
-            assert link.project.name == "Проект со ссылками"
+        assert links_project_names == ["Проект со ссылками"] * 2
 
     async def test_project_members_relationship(self, db_session: AsyncSession):
         """Тест связи проекта и пользователей (участников)."""
@@ -180,32 +162,23 @@ class TestProjectModel:
             description="Описание проекта с участниками",
         )
 
-        # Создаем пользователей с помощью вспомогательной функции
-        user1 = await create_test_user(db_session)
-        user2 = await create_test_user(db_session)
+        # Создаем пользователей: для проверки членства достаточно их id
+        user1, user2 = await bulk_create_test_users(db_session, 2)
 
-        # Добавляем пользователей в проект через вспомогательную функцию
-        await add_user_to_project(db_session, project.id, user1.id, is_admin=False)
-        await add_user_to_project(db_session, project.id, user2.id, is_admin=False)
-        await db_session.commit()
-
-        # Загружаем проект с участниками
-        stmt = (
-            select(Project)
-            .where(Project.id == project.id)
-            .options(selectinload(Project.members))
+        # Добавляем пользователей в проект одним пакетным запросом
+        await add_users_to_project(
+            db_session,
+            [
+                {"project_id": project.id, "user_id": user.id, "is_admin": False}
+                for user in (user1, user2)
+            ],
         )
-        result = await db_session.execute(stmt)
-        project = result.scalar_one()
 
-        # Загружаем пользователей с проектами
-        stmt = (
-            select(User)
-            .where(User.id.in_([user1.id, user2.id]))
-            .options(selectinload(User.projects))
+        # Загружаем проект с участниками и проектами участников одним запросом
+        result = await db_session.execute(
+            PROJECT_WITH_MEMBER_PROJECTS, {"project_id": project.id}
         )
-        result = await db_session.execute(stmt)
-        users = result.scalars().all()
+        project = result.scalar_one()
 
         # Проверяем связь с участниками
         assert len(project.members) == 2
@@ -213,7 +186,7 @@ class TestProjectModel:
         assert any(member.id == user2.id for member in project.members)
 
         # Проверяем обратную связь
-        for user in users:
+        for user in project.members:
             assert len(user.projects) == 1
             assert user.projects[0].id == project.id
 
@@ -222,12 +195,9 @@ class TestProjectModel:
     ):
         """Тест с использованием готовых фикстур."""
         # Загружаем проект с участниками
-        stmt = (
-            select(Project)
-            .where(Project.id == test_project_with_members.id)
-            .options(selectinload(Project.members))
+        result = await db_session.execute(
+            PROJECT_WITH_MEMBERS, {"project_id": test_project_with_members.id}
         )
-        result = await db_session.execute(stmt)
         project = result.scalar_one()
 
         # Проверяем, что проект имеет участников
@@ -243,12 +213,9 @@ class TestProjectModel:
     ):
         """Тест проекта с ссылками из фикстур."""
         # Загружаем проект со ссылками
-        stmt = (
-            select(Project)
-            .where(Project.id == test_project.id)
-            .options(selectinload(Project.links))
+        result = await db_session.execute(
+            PROJECT_WITH_LINKS, {"project_id": test_project.id}
         )
-        result = await db_session.execute(stmt)
         project = result.scalar_one()
 
         # Проверяем, что у проекта есть ссылки
@@ -0,0 +1,180 @@
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import src.services.project as project_module
+from src.models.project import Project, project_members
+from src.models.user import User
+from src.schemas.project import ProjectCreate, ProjectMemberCreate, PublicProject
+from src.services.project import ProjectService, reset_public_project_cache
+from tests.helpers import (
+    create_test_user,
+    create_test_project,
+    add_user_to_project,
+    count_queries,
+    unique_id,
+)
+from tests.fixtures import (
+    shared_owner,
+    shared_project,
+)
+
+
+async def _memberships(db: AsyncSession, project_id: int) -> dict:
+    """
+    Возвращает участников проекта в виде словаря {user_id: is_admin}.
+    """
+    result = await db.execute(
+        select(project_members.c.user_id, project_members.c.is_admin).where(
+            project_members.c.project_id == project_id
+        )
+    )
+    return dict(result.all())
+
+
+class TestProjectService:
+    """Тесты для сервиса проектов ProjectService."""
+
+    async def test_bulk_create_projects(self, db_session: AsyncSession):
+        """Тест массового создания проектов: порядок строк и владельцы-администраторы."""
+        first_owner = await create_test_user(db=db_session)
+        second_owner = await create_test_user(db=db_session)
+        names = [f"Bulk {unique_id()}", f"Bulk {unique_id()}"]
+
+        projects = await ProjectService(db_session).bulk_create_projects(
+            [
+                ProjectCreate(name=names[0], default_link_lifetime_days=3),
+                ProjectCreate(name=names[1]),
+            ],
+            [first_owner.id, second_owner.id],
+        )
+
+        # Проекты возвращаются в порядке входных данных
+        assert [project.name for project in projects] == names
+        assert [project.owner_id for project in projects] == [
+            first_owner.id,
+            second_owner.id,
+        ]
+        assert projects[0].default_link_lifetime_days == 3
+
+        # Владелец каждого проекта становится его администратором
+        for project in projects:
+            assert await _memberships(db_session, project.id) == {
+                project.owner_id: True
+            }
+
+    async def test_add_project_member_upsert(
+        self, db_session: AsyncSession, shared_owner: User, shared_project: Project
+    ):
+        """Тест добавления участника: повторное добавление обновляет роль."""
+        member = await create_test_user(db=db_session)
+        service = ProjectService(db_session)
+
+        with count_queries(db_session) as queries:
+            result = await service.add_project_member(
+                shared_project.id,
+                ProjectMemberCreate(email=member.email, is_admin=False),
+                shared_owner.id,
+            )
+        # Проверка прав и вставка выполняются одним запросом
+        assert sum("project_members" in query for query in queries) == 1
+        assert "успешно добавлен" in result["message"]
+        assert (await _memberships(db_session, shared_project.id))[member.id] is False
+
+        # Повторное добавление того же пользователя не создает вторую строку,
+        # а обновляет его роль
+        result = await service.add_project_member(
+            shared_project.id,
+            ProjectMemberCreate(email=member.email, is_admin=True),
+            shared_owner.id,
+        )
+        assert "обновлена" in result["message"]
+        assert (await _memberships(db_session, shared_project.id))[member.id] is True
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.add_project_member(
+                shared_project.id,
+                ProjectMemberCreate(email=f"nobody_{unique_id()}@example.com"),
+                shared_owner.id,
+            )
+        assert exc_info.value.status_code == 404
+
+    async def test_add_project_member_requires_admin(
+        self, db_session: AsyncSession, shared_project: Project
+    ):
+        """Тест добавления участника пользователем без прав администратора."""
+        member = await create_test_user(db=db_session)
+        outsider = await create_test_user(db=db_session)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await ProjectService(db_session).add_project_member(
+                shared_project.id,
+                ProjectMemberCreate(email=member.email),
+                outsider.id,
+            )
+
+        assert exc_info.value.status_code == 403
+        assert member.id not in await _memberships(db_session, shared_project.id)
+
+    async def test_check_project_admin(self, db_session: AsyncSession):
+        """Тест проверки прав администратора: строка с нужными полями и ошибки доступа."""
+        owner = await create_test_user(db=db_session)
+        admin = await create_test_user(db=db_session)
+        member = await create_test_user(db=db_session)
+        project = await create_test_project(db=db_session, owner=owner)
+        await add_user_to_project(db_session, project.id, admin.id, is_admin=True)
+        await add_user_to_project(db_session, project.id, member.id)
+        service = ProjectService(db_session)
+
+        row = await service._check_project_admin(project.id, admin.id)
+        assert (row.id, row.owner_id, row.name, row.is_admin) == (
+            project.id,
+            owner.id,
+            project.name,
+            True,
+        )
+
+        # Владелец проходит проверку, даже если не отмечен администратором
+        row = await service._check_project_admin(project.id, owner.id)
+        assert row.owner_id == owner.id
+        assert row.is_admin is False
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service._check_project_admin(project.id, member.id)
+        assert exc_info.value.status_code == 403
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service._check_project_admin(-1, owner.id)
+        assert exc_info.value.status_code == 404
+
+    async def test_public_project_cache(self, db_session: AsyncSession):
+        """Тест кэша публичного проекта: неизменяемый снимок и его сброс."""
+        service = ProjectService(db_session)
+        await reset_public_project_cache()
+        try:
+            public_project = await service.create_public_project()
+            assert isinstance(public_project, PublicProject)
+            assert public_project.name == "Public"
+
+            # Повторное обращение берет снимок из памяти процесса без запросов к БД
+            with count_queries(db_session) as queries:
+                assert await service.create_public_project() is public_project
+            assert queries == []
+
+            # Снимок общий для всех запросов, поэтому изменить его нельзя
+            with pytest.raises(ValidationError):
+                public_project.name = "Changed"
+
+            # Изменение другого проекта не сбрасывает кэш, а публичного - сбрасывает
+            await service._invalidate_public_project_cache(public_project.id + 1)
+            assert project_module._public_project_cache is not None
+            await service._invalidate_public_project_cache(public_project.id)
+            assert project_module._public_project_cache is None
+
+            reloaded = await service.create_public_project()
+            assert reloaded is not public_project
+            assert reloaded.id == public_project.id
+        finally:
+            await reset_public_project_cache()
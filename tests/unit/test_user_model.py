@@ -1,19 +1,19 @@
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from sqlalchemy.exc import IntegrityError
-from uuid import uuid4
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
 
-from src.models.user import User
+from src.models.user import User, get_user_db, SQLAlchemyUserDatabase
 from src.models.project import Project
 from src.models.link import Link
 from tests.helpers import (
     create_test_user,
+    unique_id,
     create_test_project,
-    create_test_link,
+    create_multiple_test_links,
     get_user_with_links,
-    get_project_with_members,
+    count_queries,
 )
 from tests.fixtures import (
     test_user,
@@ -24,7 +24,6 @@ from tests.fixtures import (
 )
 
 
-@pytest.mark.asyncio
 class TestUserModel:
     """Тесты для модели User."""
 
@@ -54,38 +53,36 @@ class TestUserModel:
     async def test_user_email_unique_constraint(self, db_session: AsyncSession):
         """Тестирует ограничение уникальности email пользователя."""
         # Создаем базовый email, который будет сделан уникальным внутри create_test_user
-        base_email = f"unique_test_{uuid4().hex}@example.com"
+        base_email = f"unique_test_{unique_id()}@example.com"
 
-        # Используем вспомогательную функцию для создания первого пользователя
+        # Используем вспомогательную функцию для создания первого пользователя.
+        # id задается на стороне клиента (uuid4), поэтому отдельный flush
+        # для первого пользователя не нужен
         user1 = await create_test_user(
-            db=db_session, email=base_email, password="password1"
+            db=db_session, email=base_email, password="password1", auto_flush=False
         )
 
-        # Получаем actual_email, который был сохранен для пользователя
-        # Он может отличаться от базового из-за добавления суффикса для уникальности
-        stmt = select(User).where(User.id == user1.id)
-        result = await db_session.execute(stmt)
-        saved_user = result.scalar_one()
-        actual_email = saved_user.email
+        # Итоговый email может отличаться от базового из-за суффикса
+        # для уникальности, поэтому берем его у созданного пользователя
+        actual_email = user1.email
 
         # Пытаемся создать второго пользователя с тем же email
         user2 = User(
-            email=actual_email,  # Тот же email, что был сохранен
+            email=actual_email,  # Тот же email, что у первого пользователя
             hashed_password="password2",
             is_active=True,
             is_superuser=False,
             is_verified=False,
         )
 
+        # Оба пользователя отправляются одним flush: Postgres отклоняет
+        # повторяющийся email и внутри одного пакета INSERT
         db_session.add(user2)
         with pytest.raises(IntegrityError):
             await db_session.flush()  # Должна быть ошибка из-за нарушения уникальности
 
     async def test_get_user_db(self, db_session):
         """Тестирует корректность работы асинхронного генератора get_user_db."""
-        # Импортируем здесь, чтобы сделать тест более изолированным
-        from src.models.user import get_user_db, SQLAlchemyUserDatabase
-
         # Получаем генератор
         user_db_generator = get_user_db(db_session)
 
@@ -105,8 +102,9 @@ class TestUserModel:
 
     async def test_user_projects_relationship(self, db_session: AsyncSession):
         """Тестирует связь пользователя с проектами."""
-        # Используем вспомогательные функции для создания тестовых данных
-        user = await create_test_user(db=db_session)
+        # Используем вспомогательные функции для создания тестовых данных.
+        # Объекты не сохраняются по отдельности, а отправляются одним flush
+        user = await create_test_user(db=db_session, auto_flush=False)
 
         # Создаем проекты для пользователя
         project1 = await create_test_project(
@@ -114,6 +112,7 @@ class TestUserModel:
             name="Проект 1",
             description="Описание проекта 1",
             owner=user,
+            auto_flush=False,
         )
 
         project2 = await create_test_project(
@@ -122,50 +121,66 @@ class TestUserModel:
             description="Описание проекта 2",
             owner=user,
             members=[user],  # Добавляем пользователя как участника
+            auto_flush=False,
         )
 
-        # Commit чтобы зафиксировать изменения
-        await db_session.commit()
-
-        # Загружаем проект с участниками
-        project_with_members = await get_project_with_members(db_session, project2.id)
+        # Отправляем изменения в БД; изоляцию теста обеспечивает SAVEPOINT фикстуры
+        await db_session.flush()
 
-        # Загружаем пользователя с проектами
+        # Загружаем пользователя с проектами и участниками этих проектов
+        # одним запросом: отдельная загрузка проекта не нужна.
+        # expire_all сбрасывает состояние объектов в identity map, иначе
+        # проверялись бы коллекции, собранные в памяти до flush.
+        # ID запоминаем заранее: атрибуты истекших объектов недоступны без IO
+        user_id, project1_id, project2_id = user.id, project1.id, project2.id
+        db_session.expire_all()
         stmt = (
-            select(User).where(User.id == user.id).options(selectinload(User.projects))
+            select(User)
+            .where(User.id == user_id)
+            .options(
+                selectinload(User.projects).selectinload(Project.members),
+                # Обращение к любой другой незагруженной связи вызовет ошибку
+                # вместо скрытого дополнительного запроса
+                raiseload("*", sql_only=True),
+            )
         )
-        result = await db_session.execute(stmt)
-        loaded_user = result.scalar_one()
-
-        # Проверяем связь
-        assert len(loaded_user.projects) >= 1  # Как минимум один проект должен быть
-        assert any(project.id == project2.id for project in loaded_user.projects)
+        with count_queries(db_session) as queries:
+            result = await db_session.execute(stmt)
+            loaded_user = result.scalar_one()
+        # Загрузка не деградирует до отдельного запроса на каждый проект
+        assert len(queries) <= 3
+
+        # Связь, не указанная в options, не догружается скрытым запросом.
+        # MissingGreenlet - тоже InvalidRequestError, поэтому проверяем текст
+        with pytest.raises(InvalidRequestError, match="raise_on_sql"):
+            _ = loaded_user.links
+
+        # Проверяем связь: User.projects - это членство, поэтому проект 1,
+        # которым пользователь только владеет, в нее не входит
+        project_ids = {project.id for project in loaded_user.projects}
+        assert project1_id not in project_ids
+        assert project_ids == {project2_id}
+        for project in loaded_user.projects:
+            assert project.owner_id == user_id
 
         # Проверяем, что пользователь в списке участников проекта
-        assert any(member.id == user.id for member in project_with_members.members)
+        project_with_members = next(
+            project for project in loaded_user.projects if project.id == project2_id
+        )
+        assert any(member.id == user_id for member in project_with_members.members)
 
     async def test_user_links_relationship(
         self, db_session: AsyncSession, test_user: User, test_project: Project
     ):
         """Тестирует связь пользователя со ссылками."""
-        # Создаем ссылки для тестового пользователя
-        link1 = await create_test_link(
-            db=db_session,
-            original_url="https://example.com/1",
-            short_code=f"test_link_1_{uuid4().hex[:8]}",
-            owner=test_user,
-            project=test_project,
-        )
-
-        link2 = await create_test_link(
+        link1, link2 = await create_multiple_test_links(
             db=db_session,
-            original_url="https://example.com/2",
-            short_code=f"test_link_2_{uuid4().hex[:8]}",
             owner=test_user,
             project=test_project,
+            original_urls=["https://example.com/1", "https://example.com/2"],
         )
 
-        await db_session.commit()
+        await db_session.flush()
 
         # Получаем пользователя с загруженными ссылками
         user_with_links = await get_user_with_links(db_session, test_user.id)